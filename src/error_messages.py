@@ -115,8 +115,7 @@ def exception_traceback(exception: BaseException, message: str = ""):
     if not message:
         message = (
             "ZDCurtain encountered an unhandled exception. It'll try to recover, but "
-            + "it's not guaranteed to work properly after this."
-            + CREATE_NEW_ISSUE_MESSAGE
+            f"it's not guaranteed to work properly after this.{CREATE_NEW_ISSUE_MESSAGE}"
         )
     set_text_message(
         message,
@@ -147,8 +146,8 @@ def make_excepthook(zdcurtain: "ZDCurtain"):
 
 def handle_top_level_exceptions(exception: Exception) -> NoReturn:
     message = (
-        "ZDCurtain encountered an unrecoverable exception and will probably close. "
-        + CREATE_NEW_ISSUE_MESSAGE
+        "ZDCurtain encountered an unrecoverable exception and "
+        f"will probably close. {CREATE_NEW_ISSUE_MESSAGE}"
     )
     # Print error to console if not running in executable
     if FROZEN:
@@ -160,6 +159,6 @@ def handle_top_level_exceptions(exception: Exception) -> NoReturn:
 
 CREATE_NEW_ISSUE_MESSAGE = (
     f"Please create a new Issue at <a href='https://github.com/{GITHUB_REPOSITORY}/issues'>"
-    + f"github.com/{GITHUB_REPOSITORY}/issues</a>, describe what happened, "
-    + "and copy and paste the entire error message below."
+    f"github.com/{GITHUB_REPOSITORY}/issues</a>, describe what happened, "
+    "and copy and paste the entire error message below."
 )
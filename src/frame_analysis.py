@@ -1,12 +1,24 @@
 from collections.abc import Callable
 from math import sqrt
+from typing import Any, TypeVar
 
 import cv2
 import numpy as np
 from cv2.typing import MatLike
-from skimage.measure import shannon_entropy
 
-from utils import MAXBYTE, ColorChannel, is_valid_image
+from utils import MAXBYTE, ColorChannel, ImageShape, is_valid_image
+
+T = TypeVar("T")
+
+
+def __shannon_entropy(values) -> float:
+    """
+    Shannon entropy, in bits, of the distinct values found in `values`.
+    Same result as `skimage.measure.shannon_entropy(values, base=2)`, without going through scipy.
+    """
+    _, counts = np.unique(values, return_counts=True)
+    probabilities = counts / counts.sum()
+    return float(-np.sum(probabilities * np.log2(probabilities)))
 
 
 def calculate_frame_luminance(capture: MatLike | None) -> tuple[float, float]:
@@ -15,17 +27,22 @@ def calculate_frame_luminance(capture: MatLike | None) -> tuple[float, float]:
         return 0.0, 0.0
 
     gray = cv2.cvtColor(capture, cv2.COLOR_BGR2GRAY)
-    average_luminance = np.average(gray)
+    # A single counting pass gives us both the average and the histogram
+    # cvtColor output is contiguous, so reshape is a view
+    levels = np.bincount(gray.reshape(-1), minlength=MAXRANGE)
+    average_luminance = (levels @ LUMINANCE_LEVELS) / gray.size
 
     bins = 128
-    hist, _ = np.histogram(gray.ravel(), bins=bins, range=(0, bins))
+    hist = levels[:bins].copy()
+    # Like np.histogram, the last bin is closed
+    hist[-1] += levels[bins]
 
     prob_dist = 0
 
     if hist.sum() > 0:
         prob_dist = hist / hist.sum()
 
-    image_entropy = shannon_entropy(prob_dist, base=2) / 7 * 100  # min 0, max debug_log(bins) = 7
+    image_entropy = __shannon_entropy(prob_dist) / 7 * 100  # min 0, max debug_log(bins) = 7
 
     return average_luminance, image_entropy  # type: ignore - pyright float checking is bad
 
@@ -35,13 +52,20 @@ def crop_image(capture: MatLike | None, x1, y1, x2, y2):
     if not is_valid_image(capture):
         return None
 
+    return crop_image_unchecked(capture, x1, y1, x2, y2)
+
+
+def crop_image_unchecked(capture: MatLike, x1, y1, x2, y2):
+    """Crop an image given the dimensions. The caller is responsible for validating the capture."""
     return capture[y1:y2, x1:x2]
 
 
 MAXRANGE = MAXBYTE + 1
+LUMINANCE_LEVELS = np.arange(MAXRANGE)
 CHANNELS = (ColorChannel.Red.value, ColorChannel.Green.value, ColorChannel.Blue.value)
-HISTOGRAM_SIZE = (8, 8, 8)
-RANGES = (0, MAXRANGE, 0, MAXRANGE, 0, MAXRANGE)
+HISTOGRAM_BINS = 8
+HISTOGRAM_BIN_SHIFT = 5
+"""`MAXRANGE >> HISTOGRAM_BIN_SHIFT == HISTOGRAM_BINS`"""
 MASK_SIZE_MULTIPLIER = ColorChannel.Alpha * MAXBYTE * MAXBYTE
 MAX_VALUE = 1.0
 CV2_PHASH_SIZE = 8
@@ -49,6 +73,64 @@ FLANN_INDEX_LSH = 6
 FD_RATIO_THRESHOLD = 0.8
 
 
+__reference_cache: dict[tuple, tuple[MatLike, Any]] = {}
+
+
+def __get_cached_for_reference(reference: MatLike, key: tuple, factory: Callable[[], T]) -> T:
+    """
+    Comparison images don't change between frames, so anything derived from them only needs
+    to be computed once. Holding on to the image ensures a reused `id` is never mistaken for it.
+    """
+    cache_key = (id(reference), *key)
+    cached = __reference_cache.get(cache_key)
+    if cached is None or cached[0] is not reference:
+        cached = (reference, factory())
+        __reference_cache[cache_key] = cached
+    return cached[1]
+
+
+__source_cache: dict[tuple, tuple[MatLike, Any]] = {}
+
+
+def __get_cached_for_source(source: MatLike, key: tuple, factory: Callable[[], T]) -> T:
+    """
+    The same live capture is compared against every comparison image of a load type, so anything
+    derived from it only needs to be computed once. Each capture view gets its own entry,
+    until `clear_source_cache` is called for the next frame.
+    """
+    cache_key = (id(source), *key)
+    cached = __source_cache.get(cache_key)
+    if cached is None or cached[0] is not source:
+        cached = (source, factory())
+        __source_cache[cache_key] = cached
+    return cached[1]
+
+
+def clear_source_cache():
+    """Forget what was derived from the previous frame's captures. Call before analyzing a new frame."""
+    __source_cache.clear()
+
+
+def __channel_histograms(image: MatLike, mask: MatLike | None):
+    """
+    Per-channel histograms concatenated into a single L2-normalized vector.
+
+    `np.bincount` is used instead of `cv2.calcHist`, which gives incorrect results
+    for 8-bit images when OpenCV is built with IPP.
+    """
+    pixels = image.reshape(-1, image.shape[ImageShape.Channels])
+    if is_valid_image(mask):
+        pixels = pixels[mask.ravel() > 0]
+
+    histogram = np.concatenate([
+        np.bincount(pixels[:, channel] >> HISTOGRAM_BIN_SHIFT, minlength=HISTOGRAM_BINS)
+        for channel in CHANNELS
+    ]).astype(np.float64)
+
+    norm = np.linalg.norm(histogram)
+    return histogram / norm if norm else histogram
+
+
 def compare_histograms(source: MatLike, capture: MatLike, mask: MatLike | None = None, options=None):
     """
     Compares two images by calculating their histograms, normalizing
@@ -59,13 +141,23 @@ def compare_histograms(source: MatLike, capture: MatLike, mask: MatLike | None =
     @param mask: An image matching the dimensions of the source, but 1 channel grayscale
     @return: The similarity between the histograms as a number 0 to 1.
     """
-    source_hist = cv2.calcHist([source], CHANNELS, mask, HISTOGRAM_SIZE, RANGES)
-    capture_hist = cv2.calcHist([capture], CHANNELS, mask, HISTOGRAM_SIZE, RANGES)
+    if is_valid_image(mask):
+        source_hist = __channel_histograms(source, mask)
+        capture_hist = __channel_histograms(capture, mask)
+    else:
+        source_hist = __get_cached_for_source(
+            source, ("histogram",), lambda: __channel_histograms(source, None)
+        )
+        # The capture is the comparison image, so its histogram only needs to be computed once
+        capture_hist = __get_cached_for_reference(
+            capture, ("histogram",), lambda: __channel_histograms(capture, None)
+        )
 
-    cv2.normalize(source_hist, source_hist)
-    cv2.normalize(capture_hist, capture_hist)
+    # Same formula as cv2.HISTCMP_BHATTACHARYYA
+    scale = sqrt(source_hist.sum() * capture_hist.sum())
+    coefficient = np.sqrt(source_hist * capture_hist).sum() / scale if scale else 0.0
 
-    return 1 - cv2.compareHist(source_hist, capture_hist, cv2.HISTCMP_BHATTACHARYYA)
+    return 1 - sqrt(max(1 - coefficient, 0.0))
 
 
 def compare_l2_norm(source: MatLike, capture: MatLike, mask: MatLike | None = None, options=None):
@@ -76,7 +168,12 @@ def compare_l2_norm(source: MatLike, capture: MatLike, mask: MatLike | None = No
     @param mask: An image matching the dimensions of the source, but 1 channel grayscale
     @return: The similarity between the images as a number 0 to 1.
     """
-    error = cv2.norm(source, capture, cv2.NORM_L2, mask)
+    # The two-image overload of `cv2.norm` lost its IPP fast path in OpenCV 4.3+ and is ~100x slower,
+    # computing the norm of the absolute difference gives the same result.
+    diff = cv2.absdiff(source, capture)
+    if is_valid_image(mask):
+        diff = cv2.bitwise_and(diff, diff, mask=mask)
+    error = cv2.norm(diff, cv2.NORM_L2)
 
     # The L2 Error is summed across all pixels, so this normalizes
     max_error = (
@@ -90,20 +187,15 @@ def compare_l2_norm(source: MatLike, capture: MatLike, mask: MatLike | None = No
     return 1 - (error / max_error)
 
 
-def __cv2_phash(source: MatLike, capture: MatLike):
+def __cv2_phash(image: MatLike):
     """
     OpenCV has its own pHash comparison implementation in `cv2.img_hash`,
     but is inaccurate unless we precompute the size with a specific interpolation.
 
     See: https://github.com/opencv/opencv_contrib/issues/3295#issuecomment-1172878684
     """
-    phash = cv2.img_hash.PHash.create()
-    source = cv2.resize(source, (CV2_PHASH_SIZE, CV2_PHASH_SIZE), interpolation=cv2.INTER_AREA)
-    capture = cv2.resize(capture, (CV2_PHASH_SIZE, CV2_PHASH_SIZE), interpolation=cv2.INTER_AREA)
-    source_hash = phash.compute(source)
-    capture_hash = phash.compute(capture)
-    hash_diff = phash.compare(source_hash, capture_hash)
-    return 1 - (hash_diff / 64.0)
+    image = cv2.resize(image, (CV2_PHASH_SIZE, CV2_PHASH_SIZE), interpolation=cv2.INTER_AREA)
+    return cv2.img_hash.PHash.create().compute(image)
 
 
 def compare_phash(source: MatLike, capture: MatLike, mask: MatLike | None = None, options=None):
@@ -122,11 +214,50 @@ def compare_phash(source: MatLike, capture: MatLike, mask: MatLike | None = None
     if is_valid_image(mask):
         source = cv2.bitwise_and(source, source, mask=mask)
         capture = cv2.bitwise_and(capture, capture, mask=mask)
+        source_hash = __cv2_phash(source)
+        capture_hash = __cv2_phash(capture)
+    else:
+        source_hash = __get_cached_for_source(source, ("phash",), lambda: __cv2_phash(source))
+        # The capture is the comparison image, so its hash only needs to be computed once
+        capture_hash = __get_cached_for_reference(capture, ("phash",), lambda: __cv2_phash(capture))
+
+    hash_diff = cv2.img_hash.PHash.create().compare(source_hash, capture_hash)
+    return 1 - (hash_diff / 64.0)
+
+
+def __compute_orb_descriptors(image: MatLike, nfeatures: int):
+    grayscale = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    orb = cv2.ORB_create(nfeatures=nfeatures)  # type: ignore  this exists, pyright
+    _, descriptors = orb.detectAndCompute(grayscale, None)
+    return descriptors
+
+
+def __get_reference_orb_descriptors(reference: MatLike, nfeatures: int):
+    return __get_cached_for_reference(
+        reference,
+        ("orb", nfeatures),
+        lambda: __compute_orb_descriptors(reference, nfeatures),
+    )
+
 
-    return __cv2_phash(source, capture)
+def __count_lowe_ratio_test_passes(matches, passing_ratio: float):
+    """Perform Lowe's ratio test on k=2 nearest neighbour matches and count the good ones."""
+    distances = np.array(
+        [(m.distance, n.distance) for m, n in (match for match in matches if len(match) == 2)],
+        dtype=np.float64,
+    )
+    if not distances.size:
+        return 0
+
+    return int(np.count_nonzero(distances[:, 0] < passing_ratio * distances[:, 1]))
 
 
 def compare_fd_orb_bruteforce(source: MatLike, capture: MatLike, *, options=None):
+    """
+    @param source: The live capture
+    @param capture: The comparison image, its descriptors are cached
+    @return: The amount of matches that passed Lowe's ratio test.
+    """
     if options is None:
         options = {"nfeatures": 500, "passing_ratio": FD_RATIO_THRESHOLD}
 
@@ -136,39 +267,43 @@ def compare_fd_orb_bruteforce(source: MatLike, capture: MatLike, *, options=None
     if not is_valid_image(capture):
         return None
 
-    source_grayscale = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
-    capture_grayscale = cv2.cvtColor(capture, cv2.COLOR_BGR2GRAY)
-
-    orb = cv2.ORB_create(nfeatures=options["nfeatures"])  # type: ignore  this exists, pyright
-
-    _, source_descriptors = orb.detectAndCompute(source_grayscale, None)
-    _, capture_descriptors = orb.detectAndCompute(capture_grayscale, None)
+    source_descriptors = __compute_orb_descriptors(source, options["nfeatures"])
+    capture_descriptors = __get_reference_orb_descriptors(capture, options["nfeatures"])
 
     bf = cv2.BFMatcher()  # type: ignore  not necessary
 
     matches = bf.knnMatch(source_descriptors, capture_descriptors, k=2)
 
-    # need only good matches, so create a mask
-    matches_mask = [[0, 0] for i in range(len(matches))]
+    return __count_lowe_ratio_test_passes(matches, options["passing_ratio"])
 
-    # perform Lowe's ratio test
-    final_matches = []
-    for index in range(len(matches)):
-        if len(matches[index]) == 2:
-            m, n = matches[index]
-            if m.distance < options["passing_ratio"] * n.distance:
-                matches_mask[index] = [1, 0]
-                final_matches.append(matches[index])
 
-    return len(final_matches)
+def __create_trained_flann_matcher(reference: MatLike, nfeatures: int, algorithm: int):
+    # FLANN parameters
+    index_params = {
+        "algorithm": algorithm,
+        "table_number": 6,  # 12
+        "key_size": 12,  # 20
+        "multi_probe_level": 1,
+    }
+    search_params = {}
+
+    flann = cv2.FlannBasedMatcher(index_params, search_params)  # type: ignore  not necessary
+    flann.add([__get_reference_orb_descriptors(reference, nfeatures)])
+    flann.train()
+    return flann
 
 
 def compare_fd_orb_flann(source: MatLike, capture: MatLike, *, options=None):
+    """
+    @param source: The live capture
+    @param capture: The comparison image, its descriptors and FLANN index are cached
+    @return: The amount of matches that passed Lowe's ratio test.
+    """
     if options is None:
         options = {"algorithm": FLANN_INDEX_LSH, "nfeatures": 500, "passing_ratio": FD_RATIO_THRESHOLD}
 
-    if "algorithm" not in options:
-        options["algorithm"] = FLANN_INDEX_LSH
+    # Don't modify the caller's options, they may be reused between frames
+    algorithm = options.get("algorithm", FLANN_INDEX_LSH)
 
     if not is_valid_image(source):
         return None
@@ -176,50 +311,23 @@ def compare_fd_orb_flann(source: MatLike, capture: MatLike, *, options=None):
     if not is_valid_image(capture):
         return None
 
-    source_grayscale = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
-    capture_grayscale = cv2.cvtColor(capture, cv2.COLOR_BGR2GRAY)
+    source_descriptors = __compute_orb_descriptors(source, options["nfeatures"])
 
-    orb = cv2.ORB_create(nfeatures=options["nfeatures"])  # type: ignore  this exists, pyright
-
-    _, source_descriptors = orb.detectAndCompute(source_grayscale, None)
-    _, capture_descriptors = orb.detectAndCompute(capture_grayscale, None)
-
-    # FLANN parameters
-    index_params = {
-        "algorithm": options["algorithm"],
-        "table_number": 6,  # 12
-        "key_size": 12,  # 20
-        "multi_probe_level": 1,
-    }
-    search_params = {}
-
-    flann = cv2.FlannBasedMatcher(index_params, search_params)  # type: ignore  not necessary
-
-    flann_matches = flann.knnMatch(source_descriptors, capture_descriptors, k=2)
-
-    # need only good matches, so create a mask
-    matches_mask = [[0, 0] for i in range(len(flann_matches))]
+    flann = __get_cached_for_reference(
+        capture,
+        ("flann", options["nfeatures"], algorithm),
+        lambda: __create_trained_flann_matcher(capture, options["nfeatures"], algorithm),
+    )
 
-    # perform Lowe's ratio test
-    final_matches = []
-    for index in range(len(flann_matches)):
-        if len(flann_matches[index]) == 2:
-            m, n = flann_matches[index]
-            if m.distance < options["passing_ratio"] * n.distance:
-                matches_mask[index] = [1, 0]
-                final_matches.append(flann_matches[index])
+    flann_matches = flann.knnMatch(source_descriptors, k=2)
 
-    return len(final_matches)
+    return __count_lowe_ratio_test_passes(flann_matches, options["passing_ratio"])
 
 
 def normalize_brightness_histogram(capture: MatLike):
     image_hsv = cv2.cvtColor(capture, cv2.COLOR_BGR2HSV)
 
-    h, s, v = cv2.split(image_hsv)
-
-    v_equalized = cv2.equalizeHist(v)
-
-    image_hsv = cv2.merge([h, s, v_equalized])
+    image_hsv[:, :, 2] = cv2.equalizeHist(image_hsv[:, :, 2])
 
     normalized_image = cv2.cvtColor(image_hsv, cv2.COLOR_HSV2BGR)
 
@@ -242,17 +350,14 @@ def __compare_dummy(*_: object, options=None):
     return 0.0
 
 
+COMPARISON_METHODS: dict[str, Callable] = {
+    "l2norm": compare_l2_norm,
+    "histogram": compare_histograms,
+    "phash": compare_phash,
+    "orb_bf": compare_fd_orb_bruteforce,
+    "orb_flann": compare_fd_orb_flann,
+}
+
+
 def get_comparison_method_by_name(comparison_method_name: str) -> Callable:
-    match comparison_method_name:
-        case "l2norm":
-            return compare_l2_norm
-        case "histogram":
-            return compare_histograms
-        case "phash":
-            return compare_phash
-        case "orb_bf":
-            return compare_fd_orb_bruteforce
-        case "orb_flann":
-            return compare_fd_orb_flann
-        case _:
-            return __compare_dummy
+    return COMPARISON_METHODS.get(comparison_method_name, __compare_dummy)
@@ -1,4 +1,8 @@
+import re
 from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Event
 from typing import TYPE_CHECKING, Literal, cast
 
 import keyboard
@@ -16,6 +20,10 @@ pyautogui.FAILSAFE = False
 
 SET_HOTKEY_TEXT = "Set Hotkey"
 PRESS_A_KEY_TEXT = "Press a key..."
+# Keys that "keyboard" can't send properly, see _send_hotkey
+PROBLEMATIC_KEYS_REGEX = re.compile(r"num |decimal|\+")
+# "(keypad)delete", "del", "(keypad)./decimal" and "." share these scan codes
+SHARED_KEYPAD_SCAN_CODES = frozenset({83, 52})
 
 CommandStr = Literal[
     "take_screenshot",
@@ -38,17 +46,66 @@ HOTKEYS = (
     "clear_load_removal_session",
     "restart_load_removal_session",
 )
+COMMAND_SETTINGS_KEYS = cast(
+    dict[CommandStr, str],
+    {command: f"{command}_hotkey" for command in HOTKEYS},
+)
+
+
+@dataclass
+class HotkeyBinding:
+    settings_key: str
+    """Key of the hotkey name in the settings dict"""
+    button_name: str
+    """Name of the "Set Hotkey" button on the settings widget"""
+    input_name: str
+    """Name of the hotkey input on the settings widget"""
+    emit: Callable[[], None]
+    """Emits the signal triggered by the hotkey"""
+    hook: Callable[[], None] | None = None
+    """Callback returned by `keyboard` when the hotkey was hooked, used to unhook it"""
+    key_name: str = ""
+    """Name of the set hotkey, only read by `__validate_keypad` for single-key hotkeys"""
+    is_keypad_key: bool = False
+    """Whether `key_name` is a keypad number, precomputed for `__validate_keypad`"""
+    ends_with_digit: bool = False
+    """Whether `key_name` ends with a number, precomputed for `__validate_keypad`"""
+
+
+def create_hotkey_bindings(zdcurtain: "ZDCurtain") -> dict[Hotkey, HotkeyBinding]:
+    return {
+        hotkey: HotkeyBinding(
+            settings_key=COMMAND_SETTINGS_KEYS[hotkey],
+            button_name=f"set_{hotkey}_hotkey_button",
+            input_name=f"{hotkey}_input",
+            emit=getattr(zdcurtain, f"{hotkey}_signal").emit,
+        )
+        for hotkey in cast(tuple[Hotkey, ...], HOTKEYS)
+    }
+
+
+@lru_cache(maxsize=256)
+def __get_scan_code(key: str) -> int:
+    return keyboard.key_to_scan_codes(key)[0]
+
+
+@lru_cache(maxsize=256)
+def __is_modifier_key(key: str) -> bool:
+    return keyboard.is_modifier(__get_scan_code(key))
 
 
 def remove_all_hotkeys():
     keyboard.unhook_all()
+    # The keyboard layout may have changed since the keys were last resolved
+    __get_scan_code.cache_clear()
+    __is_modifier_key.cache_clear()
 
 
 def before_setting_hotkey(zdcurtain: "ZDCurtain"):
     """Do all of these after you click "Set Hotkey" but before you type the hotkey."""
     if zdcurtain.SettingsWidget:
-        for hotkey in HOTKEYS:
-            getattr(zdcurtain.SettingsWidget, f"set_{hotkey}_hotkey_button").setEnabled(False)
+        for binding in zdcurtain.hotkey_bindings.values():
+            getattr(zdcurtain.SettingsWidget, binding.button_name).setEnabled(False)
 
 
 def after_setting_hotkey(zdcurtain: "ZDCurtain"):
@@ -57,28 +114,18 @@ def after_setting_hotkey(zdcurtain: "ZDCurtain"):
     A signal connects to this because changing GUI stuff is only possible in the main thread.
     """
     if zdcurtain.SettingsWidget:
-        for hotkey in HOTKEYS:
-            getattr(
-                zdcurtain.SettingsWidget,
-                f"set_{hotkey}_hotkey_button",
-            ).setText(SET_HOTKEY_TEXT)
-            getattr(zdcurtain.SettingsWidget, f"set_{hotkey}_hotkey_button").setEnabled(True)
+        for binding in zdcurtain.hotkey_bindings.values():
+            button = getattr(zdcurtain.SettingsWidget, binding.button_name)
+            button.setText(SET_HOTKEY_TEXT)
+            button.setEnabled(True)
 
 
 def send_command(zdcurtain: "ZDCurtain", command: CommandStr):
-    match command:
-        case "take_screenshot":
-            _send_hotkey(zdcurtain.settings_dict["take_screenshot_hotkey"])
-        case "begin_tracking":
-            _send_hotkey(zdcurtain.settings_dict["begin_tracking_hotkey"])
-        case "end_tracking":
-            _send_hotkey(zdcurtain.settings_dict["end_tracking_hotkey"])
-        case "clear_load_removal_session":
-            _send_hotkey(zdcurtain.settings_dict["clear_load_removal_session_hotkey"])
-        case "restart_load_removal_session":
-            _send_hotkey(zdcurtain.settings_dict["restart_load_removal_session_hotkey"])
-        case _:
-            raise KeyError(f"{command!r} is not a valid command")
+    try:
+        settings_key = COMMAND_SETTINGS_KEYS[command]
+    except KeyError:
+        raise KeyError(f"{command!r} is not a valid command") from None
+    _send_hotkey(zdcurtain.settings_dict[settings_key])  # pyright: ignore[reportGeneralTypeIssues]
 
 
 def _unhook(hotkey_callback: Callable[[], None] | None):
@@ -98,7 +145,7 @@ def _send_hotkey(hotkey_or_scan_code: int | str | None):
     # If an int or does not contain the following strings
     if (  # fmt: skip
         isinstance(hotkey_or_scan_code, int)
-        or not any(key in hotkey_or_scan_code for key in ("num ", "decimal", "+"))
+        or PROBLEMATIC_KEYS_REGEX.search(hotkey_or_scan_code) is None
     ):
         keyboard.send(hotkey_or_scan_code)
         return
@@ -114,7 +161,7 @@ def _send_hotkey(hotkey_or_scan_code: int | str | None):
     ])
 
 
-def __validate_keypad(expected_key: str, keyboard_event: keyboard.KeyboardEvent) -> bool:
+def __validate_keypad(binding: HotkeyBinding, keyboard_event: keyboard.KeyboardEvent) -> bool:
     """
     NOTE: This is a workaround very specific to numpads.
     Windows reports different physical keys with the same scan code.
@@ -127,37 +174,28 @@ def __validate_keypad(expected_key: str, keyboard_event: keyboard.KeyboardEvent)
     """
     # Prevent "(keypad)delete", "(keypad)./decimal" and "del" from triggering each other
     # as well as "." and "(keypad)./decimal"
-    if keyboard_event.scan_code in {83, 52}:
+    if keyboard_event.scan_code in SHARED_KEYPAD_SCAN_CODES:
         # TODO: "del" won't work with "(keypad)delete" if localized in non-english
         # (ie: "suppr" in french)
-        return expected_key == keyboard_event.name
+        return binding.key_name == keyboard_event.name
     # Prevent "action keys" from triggering "keypad keys"
     if keyboard_event.name and is_digit(keyboard_event.name[-1]):
         # Prevent "regular numbers" and "keypad numbers" from activating each other
-        return bool(
-            keyboard_event.is_keypad if expected_key.startswith("num ") else not keyboard_event.is_keypad
-        )
+        return bool(keyboard_event.is_keypad) == binding.is_keypad_key
 
     # Prevent "keypad action keys" from triggering "regular numbers" and "keypad numbers"
     # Still allow the same key that might be localized differently on keypad vs non-keypad
-    return not is_digit(expected_key[-1])
+    return not binding.ends_with_digit
 
 
-def _hotkey_action(
-    keyboard_event: keyboard.KeyboardEvent,
-    key_name: str,
-    action: Callable[[], None],
-):
+def _hotkey_action(keyboard_event: keyboard.KeyboardEvent, binding: HotkeyBinding):
     """
     We're doing the check here instead of saving the key code because
     the non-keypad shared keys are localized while the keypad ones aren't.
     They also share scan codes on Windows.
     """
-    if keyboard_event.event_type == keyboard.KEY_DOWN and __validate_keypad(
-        key_name,
-        keyboard_event,
-    ):
-        action()
+    if keyboard_event.event_type == keyboard.KEY_DOWN and __validate_keypad(binding, keyboard_event):
+        binding.emit()
 
 
 def __get_key_name(keyboard_event: keyboard.KeyboardEvent):
@@ -185,7 +223,7 @@ def __get_hotkey_name(names: list[str]):
         return names[0]
 
     def sorting_key(key: str):
-        return not keyboard.is_modifier(keyboard.key_to_scan_codes(key)[0])
+        return not __is_modifier_key(key)
 
     clean_names = sorted(keyboard.get_hotkey_name(names).split("+"), key=sorting_key)
     # Replace the last key in hotkey_name with what we actually got as a last key_name
@@ -199,56 +237,56 @@ def __read_hotkey():
     Returns the hotkey_name and last KeyboardEvent.
     """
     names: list[str] = []
-    while True:
-        keyboard_event = keyboard.read_event(True)
+    hotkey_read = Event()
+
+    def on_keyboard_event(keyboard_event: keyboard.KeyboardEvent):
+        if hotkey_read.is_set():
+            return
 
         # LiveSplit supports modifier keys as the last key, so any keyup means end of hotkey
         if keyboard_event.event_type == keyboard.KEY_UP:
             # Unless keyup is also the very first event,
             # which can happen from a very fast press at the same time we start reading
-            if not names:
-                continue
-            break
+            if names:
+                hotkey_read.set()
+            return
         key_name = __get_key_name(keyboard_event)
         # Ignore long presses
         if names and names[-1] == key_name:
-            continue
-        names.append(__get_key_name(keyboard_event))
+            return
+        names.append(key_name)
         # Stop at the first non-modifier to prevent registering a hotkey with multiple regular keys
         if not keyboard.is_modifier(keyboard_event.scan_code):
-            break
+            hotkey_read.set()
+
+    hook = keyboard.hook(on_keyboard_event, suppress=True)
+    try:
+        hotkey_read.wait()
+    finally:
+        keyboard.unhook(hook)
     return __get_hotkey_name(names)
 
 
 def __remove_key_already_set(zdcurtain: "ZDCurtain", key_name: str):
-    for hotkey in HOTKEYS:
-        settings_key = f"{hotkey}_hotkey"
-        if zdcurtain.settings_dict.get(settings_key) == key_name:
-            _unhook(getattr(zdcurtain, f"{hotkey}_hotkey"))
-            zdcurtain.settings_dict[settings_key] = ""  # pyright: ignore[reportGeneralTypeIssues]
+    for binding in zdcurtain.hotkey_bindings.values():
+        if zdcurtain.settings_dict.get(binding.settings_key) == key_name:
+            _unhook(binding.hook)
+            zdcurtain.settings_dict[binding.settings_key] = ""  # pyright: ignore[reportGeneralTypeIssues]
             if zdcurtain.SettingsWidget:
-                getattr(zdcurtain.SettingsWidget, f"{hotkey}_input").setText("")
-
-
-def __get_hotkey_action(zdcurtain: "ZDCurtain", hotkey: Hotkey):
-    return getattr(zdcurtain, f"{hotkey}_signal").emit
+                getattr(zdcurtain.SettingsWidget, binding.input_name).setText("")
 
 
 def is_valid_hotkey_name(hotkey_name: str):
-    return any(
-        key and not keyboard.is_modifier(keyboard.key_to_scan_codes(key)[0]) for key in hotkey_name.split("+")
-    )
-
-
-# TODO: using getattr/setattr is NOT a good way to go about this. It was only temporarily done to
-# reduce duplicated code. We should use a dictionary of hotkey class or something.
+    return any(key and not __is_modifier_key(key) for key in hotkey_name.split("+"))
 
 
 def set_hotkey(zdcurtain: "ZDCurtain", hotkey: Hotkey, preselected_hotkey_name: str = ""):
+    binding = zdcurtain.hotkey_bindings[hotkey]
+
     if zdcurtain.SettingsWidget:
         # Unfocus all fields
         cast(QtWidgets.QWidget, zdcurtain.SettingsWidget).setFocus()
-        getattr(zdcurtain.SettingsWidget, f"set_{hotkey}_hotkey_button").setText(PRESS_A_KEY_TEXT)
+        getattr(zdcurtain.SettingsWidget, binding.button_name).setText(PRESS_A_KEY_TEXT)
 
     # Disable some buttons
     before_setting_hotkey(zdcurtain)
@@ -262,12 +300,10 @@ def set_hotkey(zdcurtain: "ZDCurtain", hotkey: Hotkey, preselected_hotkey_name:
 
             # Unset hotkey by pressing "Escape". This is the same behaviour as LiveSplit
             if hotkey_name == "esc":
-                _unhook(getattr(zdcurtain, f"{hotkey}_hotkey"))
-                zdcurtain.settings_dict[f"{hotkey}_hotkey"] = (  # pyright: ignore[reportGeneralTypeIssues]
-                    ""
-                )
+                _unhook(binding.hook)
+                zdcurtain.settings_dict[binding.settings_key] = ""  # pyright: ignore[reportGeneralTypeIssues]
                 if zdcurtain.SettingsWidget:
-                    getattr(zdcurtain.SettingsWidget, f"{hotkey}_input").setText("")
+                    getattr(zdcurtain.SettingsWidget, binding.input_name).setText("")
                 return
 
             if not is_valid_hotkey_name(hotkey_name):
@@ -275,22 +311,22 @@ def set_hotkey(zdcurtain: "ZDCurtain", hotkey: Hotkey, preselected_hotkey_name:
                 return
 
             # Try to remove the previously set hotkey if there is one
-            _unhook(getattr(zdcurtain, f"{hotkey}_hotkey"))
+            _unhook(binding.hook)
 
             # Remove any hotkey using the same key combination
             __remove_key_already_set(zdcurtain, hotkey_name)
 
-            action = __get_hotkey_action(zdcurtain, hotkey)
-            setattr(
-                zdcurtain,
-                f"{hotkey}_hotkey",
+            binding.key_name = hotkey_name
+            binding.is_keypad_key = hotkey_name.startswith("num ")
+            binding.ends_with_digit = is_digit(hotkey_name[-1])
+            binding.hook = (
                 # keyboard.add_hotkey doesn't give the last keyboard event,
                 # so we can't __validate_keypad.
                 # This means "ctrl + num 5" and "ctrl + 5" will both be registered.
                 # For that reason, we still prefer keyboard.hook_key for single keys.
                 # keyboard module allows you to hit multiple keys for a hotkey.
                 # They are joined together by + .
-                keyboard.add_hotkey(hotkey_name, action)
+                keyboard.add_hotkey(hotkey_name, binding.emit)
                 if "+" in hotkey_name
                 # We need to inspect the event to know if it comes from numpad
                 # because of _canonial_names.
@@ -299,13 +335,13 @@ def set_hotkey(zdcurtain: "ZDCurtain", hotkey: Hotkey, preselected_hotkey_name:
                 # See: https://github.com/boppreh/keyboard/issues/216#issuecomment-431999553
                 else keyboard.hook_key(
                     hotkey_name,
-                    lambda keyboard_event: _hotkey_action(keyboard_event, hotkey_name, action),
-                ),
+                    lambda keyboard_event: _hotkey_action(keyboard_event, binding),
+                )
             )
 
             if zdcurtain.SettingsWidget:
-                getattr(zdcurtain.SettingsWidget, f"{hotkey}_input").setText(hotkey_name)
-            zdcurtain.settings_dict[f"{hotkey}_hotkey"] = (  # pyright: ignore[reportGeneralTypeIssues]
+                getattr(zdcurtain.SettingsWidget, binding.input_name).setText(hotkey_name)
+            zdcurtain.settings_dict[binding.settings_key] = (  # pyright: ignore[reportGeneralTypeIssues]
                 hotkey_name
             )
         except Exception as exception:  # noqa: BLE001 # We really want to catch everything here
@@ -2,188 +2,208 @@
 from __future__ import annotations
 
 import os
-import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-# !/usr/bin/python3
 import cv2
-
-from utils import BGR_CHANNEL_COUNT, FROZEN, ImageShape, imread, imwrite, resource_path
-from ZDImage import ZDImage
-
-if TYPE_CHECKING:
-    from ui.zdcurtain_ui import ZDCurtain
-
-# Prevent PyAutoGUI and pywinctl from setting Process DPI Awareness,
-# which Qt tries to do then throws warnings about it.
-# The unittest workaround significantly increases
-# build time, boot time and build size with PyInstaller.
-# https://github.com/asweigart/pyautogui/issues/663#issuecomment-1296719464
-# QT doesn't call those from Python/ctypes, meaning we can stop other programs from setting it.
-if sys.platform == "win32":
-    import ctypes
-
-    def do_nothing(*_): ...
-
-    # pyautogui._pyautogui_win.py
-    ctypes.windll.user32.SetProcessDPIAware = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
-    # pymonctl._pymonctl_win.py
-    # pywinbox._pywinbox_win.py
-    ctypes.windll.shcore.SetProcessDpiAwareness = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
-
-
+import numpy as np
 from cv2.typing import MatLike
 from PySide6 import QtCore, QtGui
 from PySide6.QtWidgets import QLabel
 
-from utils import BGRA_CHANNEL_COUNT, is_valid_image
+import error_messages
+from utils import (
+    BGR_CHANNEL_COUNT,
+    BGRA_CHANNEL_COUNT,
+    FROZEN,
+    MAXBYTE,
+    ColorChannel,
+    ImageShape,
+    LoadType,
+    fire_and_forget,
+    imread,
+    imwrite,
+    is_valid_image,
+    resource_path,
+)
+from ZDImage import ZDImage
 
-# Prevent PyAutoGUI and pywinctl from setting Process DPI Awareness,
-# which Qt tries to do then throws warnings about it.
-# The unittest workaround significantly increases
-# build time, boot time and build size with PyInstaller.
-# https://github.com/asweigart/pyautogui/issues/663#issuecomment-1296719464
-# QT doesn't call those from Python/ctypes, meaning we can stop other programs from setting it.
-if sys.platform == "win32":
-    import ctypes
+if TYPE_CHECKING:
+    from ui.zdcurtain_ui import ZDCurtain
 
-    def do_nothing(*_): ...
 
-    # pyautogui._pyautogui_win.py
-    ctypes.windll.user32.SetProcessDPIAware = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
-    # pymonctl._pymonctl_win.py
-    # pywinbox._pywinbox_win.py
-    ctypes.windll.shcore.SetProcessDpiAwareness = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
+ICON_IMAGES = (
+    ("elevator_icon", "res/icons/elevator_icon.png"),
+    ("tram_icon", "res/icons/tram_icon.png"),
+    ("teleportal_icon", "res/icons/teleportal_icon.png"),
+    ("capsule_icon", "res/icons/capsule_icon.png"),
+    ("gunship_icon", "res/icons/gunship_icon_small.png"),
+    ("elevator_icon_tentative", "res/icons/elevator_tentative_icon.png"),
+    ("tram_icon_tentative", "res/icons/tram_tentative_icon.png"),
+    ("teleportal_icon_tentative", "res/icons/teleportal_tentative_icon.png"),
+    ("capsule_icon_tentative", "res/icons/capsule_tentative_icon.png"),
+    ("loading_icon", "res/icons/loading_icon.png"),
+    ("loading_icon_grayed", "res/icons/loading_icon_grayed.png"),
+)
+COMPARISON_IMAGES = (
+    ("comparison_capsule_gravity", "capsule_gravity.png"),
+    ("comparison_capsule_power", "capsule_power.png"),
+    ("comparison_capsule_varia", "capsule_varia.png"),
+    ("comparison_elevator_gravity", "elevator_gravity.png"),
+    ("comparison_elevator_power", "elevator_power.png"),
+    ("comparison_elevator_varia", "elevator_varia.png"),
+    ("comparison_teleport_gravity", "teleport_gravity.png"),
+    ("comparison_teleport_power", "teleport_power.png"),
+    ("comparison_teleport_varia", "teleport_varia.png"),
+    ("comparison_train_left_gravity", "train_left_gravity.png"),
+    ("comparison_train_left_power", "train_left_power.png"),
+    ("comparison_train_left_varia", "train_left_varia.png"),
+    ("comparison_train_right_gravity", "train_right_gravity.png"),
+    ("comparison_train_right_power", "train_right_power.png"),
+    ("comparison_train_right_varia", "train_right_varia.png"),
+    ("comparison_end_screen", "end_screen.png"),
+    ("comparison_game_over_screen", "game_over_mask.png"),
+    ("comparison_loading_widget", "loading.png"),
+)
+# Decoding and converting images releases the GIL, so independent images can be loaded in parallel
+IMAGE_LOADING_WORKERS = 4
+
+
+def __load_images_into(_zdcurtain_ref, images: tuple[tuple[str, str], ...], read_function: Callable):
+    with ThreadPoolExecutor(max_workers=IMAGE_LOADING_WORKERS) as executor:
+        loaded_images = executor.map(read_function, [path for _, path in images])
+        for (attribute, _), image in zip(images, loaded_images, strict=True):
+            setattr(_zdcurtain_ref, attribute, image)
 
 
 def load_images(_zdcurtain_ref):
-    _zdcurtain_ref.elevator_icon = read_image("res/icons/elevator_icon.png")
-    _zdcurtain_ref.tram_icon = read_image("res/icons/tram_icon.png")
-    _zdcurtain_ref.teleportal_icon = read_image("res/icons/teleportal_icon.png")
-    _zdcurtain_ref.capsule_icon = read_image("res/icons/capsule_icon.png")
-    _zdcurtain_ref.gunship_icon = read_image("res/icons/gunship_icon_small.png")
-    _zdcurtain_ref.elevator_icon_tentative = read_image("res/icons/elevator_tentative_icon.png")
-    _zdcurtain_ref.tram_icon_tentative = read_image("res/icons/tram_tentative_icon.png")
-    _zdcurtain_ref.teleportal_icon_tentative = read_image("res/icons/teleportal_tentative_icon.png")
-    _zdcurtain_ref.capsule_icon_tentative = read_image("res/icons/capsule_tentative_icon.png")
-    _zdcurtain_ref.gunship_icon = read_image("res/icons/gunship_icon_small.png")
-    _zdcurtain_ref.loading_icon = read_image("res/icons/loading_icon.png")
-    _zdcurtain_ref.loading_icon_grayed = read_image("res/icons/loading_icon_grayed.png")
+    __load_images_into(_zdcurtain_ref, ICON_IMAGES, read_image)
 
 
 def load_comparison_images(_zdcurtain_ref):
-    file_path = Path.cwd() / "comparison" if FROZEN else Path.cwd() / "res" / "comparison"
-    _zdcurtain_ref.comparison_capsule_gravity = read_and_format_zdimage(
-        f"{file_path}{os.sep}capsule_gravity.png"
-    )
-    _zdcurtain_ref.comparison_capsule_power = read_and_format_zdimage(f"{file_path}{os.sep}capsule_power.png")
-    _zdcurtain_ref.comparison_capsule_varia = read_and_format_zdimage(f"{file_path}{os.sep}capsule_varia.png")
-    _zdcurtain_ref.comparison_elevator_gravity = read_and_format_zdimage(
-        f"{file_path}{os.sep}elevator_gravity.png"
-    )
-    _zdcurtain_ref.comparison_elevator_power = read_and_format_zdimage(
-        f"{file_path}{os.sep}elevator_power.png"
-    )
-    _zdcurtain_ref.comparison_elevator_varia = read_and_format_zdimage(
-        f"{file_path}{os.sep}elevator_varia.png"
-    )
-    _zdcurtain_ref.comparison_teleport_gravity = read_and_format_zdimage(
-        f"{file_path}{os.sep}teleport_gravity.png"
-    )
-    _zdcurtain_ref.comparison_teleport_power = read_and_format_zdimage(
-        f"{file_path}{os.sep}teleport_power.png"
-    )
-    _zdcurtain_ref.comparison_teleport_varia = read_and_format_zdimage(
-        f"{file_path}{os.sep}teleport_varia.png"
-    )
-    _zdcurtain_ref.comparison_train_left_gravity = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_left_gravity.png"
-    )
-    _zdcurtain_ref.comparison_train_left_power = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_left_power.png"
-    )
-    _zdcurtain_ref.comparison_train_left_varia = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_left_varia.png"
-    )
-    _zdcurtain_ref.comparison_train_right_gravity = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_right_gravity.png"
+    file_path = Path.cwd() / ("comparison" if FROZEN else "res/comparison")
+    __load_images_into(
+        _zdcurtain_ref,
+        tuple((attribute, os.fspath(file_path / filename)) for attribute, filename in COMPARISON_IMAGES),
+        read_and_format_zdimage,
     )
-    _zdcurtain_ref.comparison_train_right_power = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_right_power.png"
-    )
-    _zdcurtain_ref.comparison_train_right_varia = read_and_format_zdimage(
-        f"{file_path}{os.sep}train_right_varia.png"
-    )
-    _zdcurtain_ref.comparison_end_screen = read_and_format_zdimage(f"{file_path}{os.sep}end_screen.png")
-    _zdcurtain_ref.comparison_game_over_screen = read_and_format_zdimage(
-        f"{file_path}{os.sep}game_over_mask.png"
-    )
-    _zdcurtain_ref.comparison_loading_widget = read_and_format_zdimage(f"{file_path}{os.sep}loading.png")
 
 
 def read_image(filename):
-    image = imread(resource_path(filename), cv2.IMREAD_UNCHANGED)
+    return __read_image_from_path(resource_path(filename))
 
+
+@lru_cache(maxsize=64)
+def __read_image_from_path(path: str):
+    """Decoded images are cached by their resolved path. The returned image must not be modified."""
+    image = imread(path, cv2.IMREAD_UNCHANGED)
+
+    # imread already returns BGRA for images with transparency, only add the missing alpha channel
     if image.shape[ImageShape.Channels] == BGR_CHANNEL_COUNT:
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGRA)
-    else:
-        image = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+        height, width, _ = image.shape
+        image_bgra = np.empty((height, width, BGRA_CHANNEL_COUNT), dtype=image.dtype)
+        image_bgra[:, :, :BGR_CHANNEL_COUNT] = image
+        image_bgra[:, :, ColorChannel.Alpha] = MAXBYTE
+        image = image_bgra
 
     return image
 
 
+@lru_cache(maxsize=64)
 def read_and_format_zdimage(filename):
     return ZDImage(filename)
 
 
-def take_screenshot(directory, filename, capture):
-    imwrite(
-        f"{directory}/{filename}.png",
-        capture,
-    )
+def take_screenshot(_zdcurtain_ref: ZDCurtain, directory, filename, capture):
+    # Encoding the PNG takes a while, so don't block the caller on it.
+    # The capture is copied so that it's not affected by later frames while being written.
+    __write_screenshot(_zdcurtain_ref, f"{directory}/{filename}.png", capture.copy())
+
+
+@fire_and_forget
+def __write_screenshot(_zdcurtain_ref: ZDCurtain, path, capture):
+    try:
+        imwrite(path, capture)
+    # Exceptions raised in this thread wouldn't reach the main excepthook and be shown to the user
+    except Exception as exception:  # noqa: BLE001 # We really want to catch everything here
+        error = exception
+        _zdcurtain_ref.show_error_signal.emit(lambda: error_messages.exception_traceback(error))
+
+
+LOADING_ICONS = {
+    (LoadType.ELEVATOR, False): attrgetter("elevator_icon"),
+    (LoadType.ELEVATOR, True): attrgetter("elevator_icon_tentative"),
+    (LoadType.TRAM, False): attrgetter("tram_icon"),
+    (LoadType.TRAM, True): attrgetter("tram_icon_tentative"),
+    (LoadType.TELEPORTAL, False): attrgetter("teleportal_icon"),
+    (LoadType.TELEPORTAL, True): attrgetter("teleportal_icon_tentative"),
+    (LoadType.EGG, False): attrgetter("capsule_icon"),
+    (LoadType.EGG, True): attrgetter("capsule_icon_tentative"),
+}
 
 
 def get_loading_icon(_zdcurtain_ref: ZDCurtain, *, load_type, get_potential_load_icon):
-    match load_type:
-        case "elevator":
-            return (
-                _zdcurtain_ref.elevator_icon_tentative
-                if get_potential_load_icon
-                else _zdcurtain_ref.elevator_icon
-            )
-        case "tram":
-            return _zdcurtain_ref.tram_icon_tentative if get_potential_load_icon else _zdcurtain_ref.tram_icon
-        case "teleportal":
-            return (
-                _zdcurtain_ref.teleportal_icon_tentative
-                if get_potential_load_icon
-                else _zdcurtain_ref.teleportal_icon
-            )
-        case "egg":
-            return (
-                _zdcurtain_ref.capsule_icon_tentative
-                if get_potential_load_icon
-                else _zdcurtain_ref.capsule_icon
-            )
+    get_icon = LOADING_ICONS.get((load_type, bool(get_potential_load_icon)))
+    return get_icon(_zdcurtain_ref) if get_icon else None
+
+
+__preview_buffers: dict[int, MatLike] = {}
+"""Downscaled preview buffers, reused across frames for each label."""
+
+
+def __get_preview_buffer(qlabel: QLabel, shape: tuple[int, ...], dtype: np.dtype):
+    buffer = __preview_buffers.get(id(qlabel))
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype=dtype)
+        __preview_buffers[id(qlabel)] = buffer
+    return buffer
+
+
+__last_previews: dict[int, tuple[MatLike, QtCore.QSize]] = {}
+"""Last image shown and label size for each label. Holding the image ensures its identity isn't reused."""
 
 
 def set_preview_image(qlabel: QLabel, image: MatLike | None):
     if not is_valid_image(image):
+        __last_previews.pop(id(qlabel), None)
         # Clear current pixmap if no image. But don't clear text
         if not qlabel.text():
             qlabel.clear()
     else:
+        # Capture methods return the same frame until a new one is ready, don't redraw it
+        label_size = qlabel.size()
+        last_preview = __last_previews.get(id(qlabel))
+        if last_preview and last_preview[0] is image and last_preview[1] == label_size:
+            return
+        __last_previews[id(qlabel)] = (image, label_size)
+
+        label_width, label_height = label_size.width(), label_size.height()
+        # Shrinking a large capture with INTER_AREA is much cheaper than Qt's smooth scaling of it
+        if label_width > 0 and label_height > 0 and (
+            image.shape[ImageShape.X] > label_width or image.shape[ImageShape.Y] > label_height
+        ):
+            image = cv2.resize(
+                image,
+                (label_width, label_height),
+                dst=__get_preview_buffer(qlabel, (label_height, label_width, *image.shape[2:]), image.dtype),
+                interpolation=cv2.INTER_AREA,
+            )
+
         height, width, channels = image.shape
 
-        if channels == BGRA_CHANNEL_COUNT:
-            image_format = QtGui.QImage.Format.Format_RGBA8888
-            capture = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
-        else:
-            image_format = QtGui.QImage.Format.Format_BGR888
-            capture = image
+        # BGRA bytes are ARGB32 on little-endian, so no conversion is needed.
+        # The pixmap below copies the pixels, so the QImage can borrow the capture's buffer.
+        image_format = (
+            QtGui.QImage.Format.Format_ARGB32
+            if channels == BGRA_CHANNEL_COUNT
+            else QtGui.QImage.Format.Format_BGR888
+        )
 
-        qimage = QtGui.QImage(capture.data, width, height, width * channels, image_format)
+        qimage = QtGui.QImage(image.data, width, height, image.strides[0], image_format)
         qlabel.setPixmap(
             QtGui.QPixmap(qimage).scaled(
                 qlabel.size(),
@@ -1,16 +1,97 @@
 #!/usr/bin/python3
+from collections.abc import Callable
 from time import perf_counter_ns
 from typing import TYPE_CHECKING
 
 import error_messages
-from frame_analysis import calculate_frame_luminance, get_comparison_method_by_name
-from utils import DREAD_MAX_DELTA_MS, LocalTime, create_icon, debug_log, is_valid_image, ms_to_ns, ns_to_ms
+from frame_analysis import calculate_frame_luminance, clear_source_cache, get_comparison_method_by_name
+from utils import (
+    DREAD_MAX_DELTA_MS,
+    LoadType,
+    LocalTime,
+    create_icon,
+    debug_log,
+    is_valid_image,
+    ms_to_ns,
+    ns_to_ms,
+)
 
 if TYPE_CHECKING:
     from ui.zdcurtain_ui import ZDCurtain
 
 GAMEOVER_FEATURE_SIMILARITY_THRESHOLD = 50
 LOADING_WIDGET_SIMILARITY_THRESHOLD = 10
+GAMEOVER_FEATURE_OPTIONS = {"nfeatures": 500, "passing_ratio": 0.5}
+LOADING_WIDGET_FEATURE_OPTIONS = {"nfeatures": 10000, "passing_ratio": 0.5}
+DREAD_MAX_DELTA_NS = ms_to_ns(DREAD_MAX_DELTA_MS)
+SIMILARITY_ANALYSIS_WORKERS = 4
+"""Threads used to run the similarity comparisons of a frame concurrently"""
+
+LOAD_COOLDOWN_SETTINGS = {
+    load_type: f"load_cooldown_{load_type.label}_ms"
+    for load_type in (LoadType.ELEVATOR, LoadType.TRAM, LoadType.TELEPORTAL, LoadType.EGG, LoadType.SPINNER)
+}
+"""Settings key of the cooldown after each load type"""
+LOAD_DETECTION_ACTIVE_LOAD_TYPES = LoadType.NONE | LoadType.BLACK
+END_SCREEN_DETECTION_ACTIVE_LOAD_TYPES = LoadType.NONE
+
+SIMILARITY_COMPARISONS = (
+    (
+        "elevator",
+        ("comparison_elevator_power", "comparison_elevator_varia", "comparison_elevator_gravity"),
+        LOAD_DETECTION_ACTIVE_LOAD_TYPES,
+    ),
+    (
+        "tram",
+        (
+            "comparison_train_left_power",
+            "comparison_train_left_varia",
+            "comparison_train_left_gravity",
+            "comparison_train_right_power",
+            "comparison_train_right_varia",
+            "comparison_train_right_gravity",
+        ),
+        LOAD_DETECTION_ACTIVE_LOAD_TYPES,
+    ),
+    (
+        "teleportal",
+        ("comparison_teleport_power", "comparison_teleport_varia", "comparison_teleport_gravity"),
+        LOAD_DETECTION_ACTIVE_LOAD_TYPES,
+    ),
+    (
+        "egg",
+        ("comparison_capsule_power", "comparison_capsule_varia", "comparison_capsule_gravity"),
+        LOAD_DETECTION_ACTIVE_LOAD_TYPES,
+    ),
+    ("end_screen", ("comparison_end_screen",), END_SCREEN_DETECTION_ACTIVE_LOAD_TYPES),
+)
+"""
+Load types (and the end screen) compared every frame, with the reference images they are compared against,
+and the mask of active load types during which the similarity is used by the load removal logic.
+Each uses the `similarity_to_*` attribute and the `similarity_algorithm_*` and `capture_view_*` settings.
+"""
+
+LOAD_CONFIDENCE_CHECKS = (
+    (LoadType.ELEVATOR, "similarity_to_elevator", "similarity_threshold_elevator", "elevator_tracking_icon"),
+    (LoadType.TRAM, "similarity_to_tram", "similarity_threshold_tram", "tram_tracking_icon"),
+    (
+        LoadType.TELEPORTAL,
+        "similarity_to_teleportal",
+        "similarity_threshold_teleportal",
+        "teleportal_tracking_icon",
+    ),
+    (LoadType.EGG, "similarity_to_egg", "similarity_threshold_egg", "egg_tracking_icon"),
+    (LoadType.SPINNER, "similarity_to_loading_widget", None, "black_screen_load_icon"),
+)
+"""
+Load types checked for confidence, in order, with their similarity attribute, their threshold's settings key
+(`None` uses `LOADING_WIDGET_SIMILARITY_THRESHOLD`) and the icon shown once they are detected.
+"""
+
+__similarity_dispatch_cache: dict[
+    int,
+    tuple[object, tuple[tuple[str, Callable, str, list, int], ...]],
+] = {}
 
 
 def perform_load_removal_logic(_zdcurtain_ref: "ZDCurtain"):
@@ -21,23 +102,25 @@ def perform_load_removal_logic(_zdcurtain_ref: "ZDCurtain"):
     if not _zdcurtain_ref.is_tracking or _zdcurtain_ref.load_removal_session is None:
         return
 
-    __check_load_cooldown(_zdcurtain_ref)
-    __check_black_screen_markers(_zdcurtain_ref)
-    __check_load_blocking_logic(_zdcurtain_ref)
-    __check_for_active_loads(_zdcurtain_ref)
-    __check_if_load_ending(_zdcurtain_ref)
+    now = perf_counter_ns()
+
+    __check_load_cooldown(_zdcurtain_ref, now)
+    __check_black_screen_markers(_zdcurtain_ref, now)
+    __check_load_blocking_logic(_zdcurtain_ref, now)
+    __check_for_active_loads(_zdcurtain_ref, now)
+    __check_if_load_ending(_zdcurtain_ref, now)
 
 
 def is_end_screen(_zdcurtain_ref: "ZDCurtain", similarity, threshold):
-    return similarity > threshold and _zdcurtain_ref.active_load_type == "none"
+    return similarity > threshold and _zdcurtain_ref.active_load_type == LoadType.NONE
 
 
 def end_tracking_load(_zdcurtain_ref: "ZDCurtain", *, due_to_error=True):
-    if _zdcurtain_ref.active_load_type != "black":
+    if _zdcurtain_ref.active_load_type != LoadType.BLACK:
         _zdcurtain_ref.set_middle_of_load_dependencies_enabled(should_be_enabled=True)
 
-    _zdcurtain_ref.potential_load_type = "none"
-    _zdcurtain_ref.active_load_type = "none"
+    _zdcurtain_ref.potential_load_type = LoadType.NONE
+    _zdcurtain_ref.active_load_type = LoadType.NONE
     _zdcurtain_ref.load_confidence_delta = 0
     _zdcurtain_ref.potential_load_detected_at_timestamp = 0
     _zdcurtain_ref.confirmed_load_detected_at_timestamp = 0
@@ -73,137 +156,62 @@ def perform_similarity_analysis(_zdcurtain_ref: "ZDCurtain"):
         return
 
     zd = _zdcurtain_ref
-    zdsettings = _zdcurtain_ref.settings_dict
-
-    images = [
-        zd.comparison_elevator_power.image_data,
-        zd.comparison_elevator_varia.image_data,
-        zd.comparison_elevator_gravity.image_data,
-    ]
-
-    zd.similarity_to_elevator = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_elevator"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_elevator"]),
-            images,
-        )
-        * 100
-    )
-
-    images = [
-        zd.comparison_train_left_power.image_data,
-        zd.comparison_train_left_varia.image_data,
-        zd.comparison_train_left_gravity.image_data,
-        zd.comparison_train_right_power.image_data,
-        zd.comparison_train_right_varia.image_data,
-        zd.comparison_train_right_gravity.image_data,
-    ]
-
-    zd.similarity_to_tram = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_tram"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_tram"]),
-            images,
-        )
-        * 100
-    )
-
-    images = [
-        zd.comparison_teleport_power.image_data,
-        zd.comparison_teleport_varia.image_data,
-        zd.comparison_teleport_gravity.image_data,
-    ]
-
-    zd.similarity_to_teleportal = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_teleportal"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_teleportal"]),
-            images,
-        )
-        * 100
-    )
-
-    images = [
-        zd.comparison_capsule_power.image_data,
-        zd.comparison_capsule_varia.image_data,
-        zd.comparison_capsule_gravity.image_data,
-    ]
-
-    zd.similarity_to_egg = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_egg"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_egg"]),
-            images,
-        )
-        * 100
-    )
-
-    images = [
-        zd.comparison_capsule_power.image_data,
-        zd.comparison_capsule_varia.image_data,
-        zd.comparison_capsule_gravity.image_data,
-    ]
-
-    zd.similarity_to_egg = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_egg"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_egg"]),
-            images,
-        )
-        * 100
-    )
-
-    images = [
-        zd.comparison_end_screen.image_data,
-    ]
-
-    zd.similarity_to_end_screen = (
-        __perform_similarity_analysis_for_images(
-            zdsettings["similarity_algorithm_end_screen"],
-            zd.get_capture_view_by_name(zdsettings["capture_view_end_screen"]),
-            images,
-        )
-        * 100
-    )
-
-    if zd.in_black_slice and zd.active_load_type != "spinner":
-        capture_type_to_use = zd.get_capture_view_by_name("standard_resized")
-
-        images = [
-            zd.comparison_loading_widget.image_data,
-        ]
-
-        zd.similarity_to_loading_widget = int(
-            __perform_similarity_analysis_for_images(
-                "orb_bf",
-                capture_type_to_use,
-                images,
-                options={
-                    "nfeatures": 10000,
-                    "passing_ratio": 0.5,
-                },
-            )
-        )
-    else:
-        zd.similarity_to_loading_widget = 0
+    clear_source_cache()
+    # The comparisons are independent and OpenCV releases the GIL, so they can run concurrently
+    executor = zd.similarity_analysis_executor
+    similarity_futures = []
+
+    for (
+        similarity_attribute,
+        comparison_method,
+        capture_view_name,
+        images,
+        used_during_load_types,
+    ) in __get_similarity_dispatch(zd):
+        # Don't compare against images whose similarity would be ignored anyway
+        if not zd.active_load_type & used_during_load_types:
+            setattr(zd, similarity_attribute, 0.0)
+            continue
+
+        capture = zd.get_capture_view_by_name(capture_view_name)
+        similarity_futures.append((
+            similarity_attribute,
+            executor.submit(__get_highest_similarity, comparison_method, capture, images),
+        ))
 
     capture_type_to_use = zd.get_capture_view_by_name("standard_resized")
 
-    images = [
-        zd.comparison_game_over_screen.image_data,
-    ]
+    loading_widget_future = None
+    # The spinner is only looked for while new loads can be detected
+    if zd.in_black_slice and zd.active_load_type & LOAD_DETECTION_ACTIVE_LOAD_TYPES:
+        loading_widget_future = executor.submit(
+            __perform_similarity_analysis_for_images,
+            "orb_bf",
+            capture_type_to_use,
+            [zd.comparison_loading_widget.image_data],
+            options=LOADING_WIDGET_FEATURE_OPTIONS,
+        )
 
-    zd.similarity_to_game_over_screen = int(
-        __perform_similarity_analysis_for_images(
+    # Game over only blocks the detection of new loads. While a load is being removed, the previous
+    # value is kept so that leaving the game over screen isn't detected until the comparison resumes.
+    game_over_future = None
+    if zd.active_load_type & LOAD_DETECTION_ACTIVE_LOAD_TYPES:
+        game_over_future = executor.submit(
+            __perform_similarity_analysis_for_images,
             "orb_flann",
             capture_type_to_use,
-            images,
-            options={
-                "nfeatures": 500,
-                "passing_ratio": 0.5,
-            },
+            [zd.comparison_game_over_screen.image_data],
+            options=GAMEOVER_FEATURE_OPTIONS,
         )
+
+    for similarity_attribute, future in similarity_futures:
+        setattr(zd, similarity_attribute, future.result() * 100)
+
+    zd.similarity_to_loading_widget = (
+        int(loading_widget_future.result()) if loading_widget_future is not None else 0
     )
+    if game_over_future is not None:
+        zd.similarity_to_game_over_screen = int(game_over_future.result())
 
     __set_local_extremes(_zdcurtain_ref)
 
@@ -216,7 +224,7 @@ def mark_load_as_lost(_zdcurtain_ref: "ZDCurtain"):
         load_lost_at = LocalTime()
 
         _ = _zdcurtain_ref.load_removal_session.create_lost_load_record(
-            _zdcurtain_ref.active_load_type, load_lost_at
+            _zdcurtain_ref.active_load_type.label, load_lost_at
         )
 
         _zdcurtain_ref.after_load_list_changed_signal.emit()
@@ -236,7 +244,7 @@ def mark_load_as_discarded(_zdcurtain_ref: "ZDCurtain", discard_type):
         load_discarded_at = LocalTime()
 
         _ = _zdcurtain_ref.load_removal_session.create_discarded_load_record(
-            _zdcurtain_ref.active_load_type, load_discarded_at, discard_type
+            _zdcurtain_ref.active_load_type.label, load_discarded_at, discard_type
         )
 
         _zdcurtain_ref.after_load_list_changed_signal.emit()
@@ -244,9 +252,41 @@ def mark_load_as_discarded(_zdcurtain_ref: "ZDCurtain", discard_type):
         end_tracking_load(_zdcurtain_ref, due_to_error=False)
 
 
+def __get_similarity_dispatch(_zdcurtain_ref: "ZDCurtain"):
+    """
+    Resolves the comparison method, capture view and reference images of each `SIMILARITY_COMPARISONS` entry.
+    These only change when a profile is loaded, which replaces the settings dict,
+    so the result is cached until the settings dict is a different object.
+    """
+    settings = _zdcurtain_ref.settings_dict
+    cached = __similarity_dispatch_cache.get(id(settings))
+    # The settings dict is kept in the cache so that its id can't be reused by a new one
+    if cached is not None and cached[0] is settings:
+        return cached[1]
+
+    similarity_dispatch = tuple(
+        (
+            f"similarity_to_{name}",
+            get_comparison_method_by_name(settings[f"similarity_algorithm_{name}"]),
+            settings[f"capture_view_{name}"],
+            [getattr(_zdcurtain_ref, image).image_data for image in images],
+            used_during_load_types,
+        )
+        for name, images, used_during_load_types in SIMILARITY_COMPARISONS
+    )
+    __similarity_dispatch_cache.clear()
+    __similarity_dispatch_cache[id(settings)] = (settings, similarity_dispatch)
+
+    return similarity_dispatch
+
+
 def __perform_similarity_analysis_for_images(comparison_method_name, capture, image_list, *, options=None):
-    comparison_method_to_use = get_comparison_method_by_name(comparison_method_name)
+    return __get_highest_similarity(
+        get_comparison_method_by_name(comparison_method_name), capture, image_list, options=options
+    )
+
 
+def __get_highest_similarity(comparison_method_to_use, capture, image_list, *, options=None):
     highest_value = 0.0
 
     for i in image_list:
@@ -257,57 +297,53 @@ def __perform_similarity_analysis_for_images(comparison_method_name, capture, im
     return highest_value
 
 
-def __check_black_screen_markers(_zdcurtain_ref: "ZDCurtain"):
-    if (
-        _zdcurtain_ref.full_black_level < _zdcurtain_ref.settings_dict["black_threshold"]
-        and _zdcurtain_ref.full_shannon_entropy < _zdcurtain_ref.settings_dict["black_entropy_threshold"]
-        and not _zdcurtain_ref.in_black_screen
-    ):
-        _zdcurtain_ref.in_black_screen = True
-        _zdcurtain_ref.full_black_detected_at_timestamp = perf_counter_ns()
-        debug_log(f"Entered full black at timestamp {_zdcurtain_ref.full_black_detected_at_timestamp}")
-
-    if (
-        _zdcurtain_ref.full_black_level >= _zdcurtain_ref.settings_dict["black_threshold"]
-        or _zdcurtain_ref.full_shannon_entropy >= _zdcurtain_ref.settings_dict["black_entropy_threshold"]
-    ) and _zdcurtain_ref.in_black_screen:
-        _zdcurtain_ref.full_black_over_detected_at_timestamp = perf_counter_ns()
-        _zdcurtain_ref.in_black_screen = False
-        debug_log(f"Left full black at timestamp {_zdcurtain_ref.full_black_over_detected_at_timestamp}")
-
-    if (
-        _zdcurtain_ref.slice_black_level < _zdcurtain_ref.settings_dict["black_threshold"]
-        and _zdcurtain_ref.slice_shannon_entropy < _zdcurtain_ref.settings_dict["black_entropy_threshold"]
-        and not _zdcurtain_ref.in_black_slice
-    ):
-        _zdcurtain_ref.slice_black_detected_at_timestamp = perf_counter_ns()
-        _zdcurtain_ref.in_black_slice = True
-        debug_log(f"Entered slice black at timestamp {_zdcurtain_ref.slice_black_detected_at_timestamp}")
-
-    if (
-        _zdcurtain_ref.slice_black_level >= _zdcurtain_ref.settings_dict["black_threshold"]
-        or _zdcurtain_ref.slice_shannon_entropy >= _zdcurtain_ref.settings_dict["black_entropy_threshold"]
-    ) and _zdcurtain_ref.in_black_slice:
-        _zdcurtain_ref.slice_black_over_detected_at_timestamp = perf_counter_ns()
-        _zdcurtain_ref.in_black_slice = False
-        debug_log(f"Left slice black at timestamp {_zdcurtain_ref.slice_black_over_detected_at_timestamp}")
+def __check_black_screen_markers(_zdcurtain_ref: "ZDCurtain", now: int):
+    zd = _zdcurtain_ref
+    black_threshold = zd.settings_dict["black_threshold"]
+    black_entropy_threshold = zd.settings_dict["black_entropy_threshold"]
 
+    # Entering and leaving black are complementary, so whether the frame is black is only decided once
+    is_full_black = (
+        zd.full_black_level < black_threshold and zd.full_shannon_entropy < black_entropy_threshold
+    )
+    is_slice_black = (
+        zd.slice_black_level < black_threshold and zd.slice_shannon_entropy < black_entropy_threshold
+    )
 
-def __check_load_blocking_logic(_zdcurtain_ref: "ZDCurtain"):
+    if is_full_black and not zd.in_black_screen:
+        zd.in_black_screen = True
+        zd.full_black_detected_at_timestamp = now
+        debug_log(f"Entered full black at timestamp {now}")
+    elif not is_full_black and zd.in_black_screen:
+        zd.full_black_over_detected_at_timestamp = now
+        zd.in_black_screen = False
+        debug_log(f"Left full black at timestamp {now}")
+
+    if is_slice_black and not zd.in_black_slice:
+        zd.slice_black_detected_at_timestamp = now
+        zd.in_black_slice = True
+        debug_log(f"Entered slice black at timestamp {now}")
+    elif not is_slice_black and zd.in_black_slice:
+        zd.slice_black_over_detected_at_timestamp = now
+        zd.in_black_slice = False
+        debug_log(f"Left slice black at timestamp {now}")
+
+
+def __check_load_blocking_logic(_zdcurtain_ref: "ZDCurtain", now: int):
     if (
         _zdcurtain_ref.similarity_to_game_over_screen >= GAMEOVER_FEATURE_SIMILARITY_THRESHOLD
         and not _zdcurtain_ref.in_game_over_screen
     ):
         _zdcurtain_ref.in_game_over_screen = True
         _zdcurtain_ref.should_block_load_detection = True
-        debug_log(f"Entered gameover at timestamp {perf_counter_ns()}")
+        debug_log(f"Entered gameover at timestamp {now}")
     elif (
         _zdcurtain_ref.similarity_to_game_over_screen < GAMEOVER_FEATURE_SIMILARITY_THRESHOLD
         and _zdcurtain_ref.in_game_over_screen
     ):
         _zdcurtain_ref.in_game_over_screen = False
         _zdcurtain_ref.should_block_load_detection = False
-        debug_log(f"Left gameover at timestamp {perf_counter_ns()}")
+        debug_log(f"Left gameover at timestamp {now}")
 
 
 def __set_local_extremes(_zdcurtain_ref: "ZDCurtain"):
@@ -324,21 +360,20 @@ def __set_local_extremes(_zdcurtain_ref: "ZDCurtain"):
         zd.similarity_to_loading_widget, zd.similarity_to_loading_widget_max
     )
 
-    zd.similarity_to_end_screen_max = max(zd.similarity_to_end_screen_max, zd.similarity_to_end_screen)
     zd.full_shannon_entropy_min = min(zd.full_shannon_entropy, zd.full_shannon_entropy_min)
     zd.slice_shannon_entropy_min = min(zd.slice_shannon_entropy, zd.slice_shannon_entropy_min)
 
 
-def __check_for_active_loads(_zdcurtain_ref: "ZDCurtain"):
+def __check_for_active_loads(_zdcurtain_ref: "ZDCurtain", now: int):
     if (
         _zdcurtain_ref.in_black_screen
-        and _zdcurtain_ref.active_load_type in "none"
+        and _zdcurtain_ref.active_load_type == LoadType.NONE
         and not _zdcurtain_ref.load_cooldown_is_active
         and not _zdcurtain_ref.should_block_load_detection
-        and perf_counter_ns() - _zdcurtain_ref.full_black_detected_at_timestamp > ms_to_ns(DREAD_MAX_DELTA_MS)
+        and now - _zdcurtain_ref.full_black_detected_at_timestamp > DREAD_MAX_DELTA_NS
     ):
-        _zdcurtain_ref.confirmed_load_detected_at_timestamp = perf_counter_ns()
-        _zdcurtain_ref.active_load_type = "black"
+        _zdcurtain_ref.confirmed_load_detected_at_timestamp = now
+        _zdcurtain_ref.active_load_type = LoadType.BLACK
         create_icon(_zdcurtain_ref.black_screen_load_icon, _zdcurtain_ref.loading_icon)
         _zdcurtain_ref.after_changing_icon_signal.emit()
         debug_log(f"Detected black load at {_zdcurtain_ref.confirmed_load_detected_at_timestamp}")
@@ -346,63 +381,38 @@ def __check_for_active_loads(_zdcurtain_ref: "ZDCurtain"):
     label = None
 
     if (
-        _zdcurtain_ref.active_load_type in {"none", "black"}
+        _zdcurtain_ref.active_load_type & LOAD_DETECTION_ACTIVE_LOAD_TYPES
         and not _zdcurtain_ref.load_cooldown_is_active
         and not _zdcurtain_ref.should_block_load_detection
         and not _zdcurtain_ref.in_game_over_screen
     ):
-        if __check_load_confidence(
-            _zdcurtain_ref,
-            "elevator",
-            _zdcurtain_ref.similarity_to_elevator,
-            _zdcurtain_ref.settings_dict["similarity_threshold_elevator"],
-        ):
-            _zdcurtain_ref.active_load_type = "elevator"
-            label = _zdcurtain_ref.elevator_tracking_icon
-
-        if __check_load_confidence(
-            _zdcurtain_ref,
-            "tram",
-            _zdcurtain_ref.similarity_to_tram,
-            _zdcurtain_ref.settings_dict["similarity_threshold_tram"],
-        ):
-            _zdcurtain_ref.active_load_type = "tram"
-            label = _zdcurtain_ref.tram_tracking_icon
-
-        if __check_load_confidence(
-            _zdcurtain_ref,
-            "teleportal",
-            _zdcurtain_ref.similarity_to_teleportal,
-            _zdcurtain_ref.settings_dict["similarity_threshold_teleportal"],
-        ):
-            _zdcurtain_ref.active_load_type = "teleportal"
-            label = _zdcurtain_ref.teleportal_tracking_icon
-
-        if __check_load_confidence(
-            _zdcurtain_ref,
-            "egg",
-            _zdcurtain_ref.similarity_to_egg,
-            _zdcurtain_ref.settings_dict["similarity_threshold_egg"],
-        ):
-            _zdcurtain_ref.active_load_type = "egg"
-            label = _zdcurtain_ref.egg_tracking_icon
-
-        if __check_load_confidence(
-            _zdcurtain_ref,
-            "spinner",
-            _zdcurtain_ref.similarity_to_loading_widget,
-            LOADING_WIDGET_SIMILARITY_THRESHOLD,
-        ):
-            _zdcurtain_ref.active_load_type = "spinner"
-            label = _zdcurtain_ref.black_screen_load_icon
+        # Only read the settings when loads can actually be detected this frame
+        settings = _zdcurtain_ref.settings_dict
+        load_confidence_threshold_ns = ms_to_ns(settings["load_confidence_threshold_ms"])
+
+        for load_type, similarity_attribute, threshold_setting, icon_attribute in LOAD_CONFIDENCE_CHECKS:
+            threshold = LOADING_WIDGET_SIMILARITY_THRESHOLD
+            if threshold_setting is not None:
+                threshold = settings[threshold_setting]
+
+            if __check_load_confidence(
+                _zdcurtain_ref,
+                load_type,
+                getattr(_zdcurtain_ref, similarity_attribute),
+                threshold,
+                now,
+                load_confidence_threshold_ns,
+            ):
+                _zdcurtain_ref.active_load_type = load_type
+                label = getattr(_zdcurtain_ref, icon_attribute)
+                # Once a load is confirmed, the remaining checks can't confirm another one
+                break
 
-        if not _zdcurtain_ref.is_load_being_removed and _zdcurtain_ref.active_load_type != "none":
+        if not _zdcurtain_ref.is_load_being_removed and _zdcurtain_ref.active_load_type != LoadType.NONE:
             _zdcurtain_ref.is_load_being_removed = True
-            _zdcurtain_ref.captured_window_title_before_load = _zdcurtain_ref.settings_dict[
-                "captured_window_title"
-            ]
+            _zdcurtain_ref.captured_window_title_before_load = settings["captured_window_title"]
 
-            if _zdcurtain_ref.active_load_type != "black" and label is not None:
+            if _zdcurtain_ref.active_load_type != LoadType.BLACK and label is not None:
                 create_icon(
                     label,
                     _zdcurtain_ref.loading_icon,
@@ -410,54 +420,60 @@ def __check_for_active_loads(_zdcurtain_ref: "ZDCurtain"):
                 _zdcurtain_ref.after_changing_icon_signal.emit()
                 _zdcurtain_ref.set_middle_of_load_dependencies_enabled(should_be_enabled=False)
                 debug_log(
-                    f'Detected "{_zdcurtain_ref.active_load_type}" load at '
+                    f'Detected "{_zdcurtain_ref.active_load_type.label}" load at '
                     + f"{_zdcurtain_ref.confirmed_load_detected_at_timestamp}"
                 )
                 debug_log(f"Expected delta: {ns_to_ms(_zdcurtain_ref.load_confidence_delta)}ms")
-        elif _zdcurtain_ref.active_load_type == "none":
+        elif _zdcurtain_ref.active_load_type == LoadType.NONE:
             match _zdcurtain_ref.potential_load_type:
-                case "elevator":
+                case LoadType.ELEVATOR:
                     create_icon(
                         _zdcurtain_ref.elevator_tracking_icon,
                         _zdcurtain_ref.elevator_icon_tentative,
                     )
                     _zdcurtain_ref.after_changing_icon_signal.emit()
-                case "tram":
+                case LoadType.TRAM:
                     create_icon(
                         _zdcurtain_ref.tram_tracking_icon,
                         _zdcurtain_ref.tram_icon_tentative,
                     )
                     _zdcurtain_ref.after_changing_icon_signal.emit()
-                case "teleportal":
+                case LoadType.TELEPORTAL:
                     create_icon(
                         _zdcurtain_ref.teleportal_tracking_icon,
                         _zdcurtain_ref.teleportal_icon_tentative,
                     )
                     _zdcurtain_ref.after_changing_icon_signal.emit()
-                case "egg":
+                case LoadType.EGG:
                     create_icon(
                         _zdcurtain_ref.egg_tracking_icon,
                         _zdcurtain_ref.capsule_icon_tentative,
                     )
                     _zdcurtain_ref.after_changing_icon_signal.emit()
-                case "none":
+                case LoadType.NONE:
                     _zdcurtain_ref.reset_icons()
 
 
 def __check_load_confidence(
-    _zdcurtain_ref: "ZDCurtain", load_type, similarity, threshold, *, use_slice_black=True
+    _zdcurtain_ref: "ZDCurtain",
+    load_type,
+    similarity,
+    threshold,
+    now: int,
+    load_confidence_threshold_ns: int,
+    *,
+    use_slice_black=True,
 ):
-    if similarity > threshold and _zdcurtain_ref.active_load_type == "none":
+    if similarity > threshold and _zdcurtain_ref.active_load_type == LoadType.NONE:
         if _zdcurtain_ref.potential_load_detected_at_timestamp == 0:
-            _zdcurtain_ref.potential_load_detected_at_timestamp = perf_counter_ns()
+            _zdcurtain_ref.potential_load_detected_at_timestamp = now
             _zdcurtain_ref.potential_load_type = load_type
 
         if (
-            perf_counter_ns() - _zdcurtain_ref.potential_load_detected_at_timestamp
-            > ms_to_ns(_zdcurtain_ref.settings_dict["load_confidence_threshold_ms"])
-            or load_type == "spinner"
+            now - _zdcurtain_ref.potential_load_detected_at_timestamp > load_confidence_threshold_ns
+            or load_type == LoadType.SPINNER
         ):
-            _zdcurtain_ref.confirmed_load_detected_at_timestamp = perf_counter_ns()
+            _zdcurtain_ref.confirmed_load_detected_at_timestamp = now
 
             black_screen_detection_timestamp = (
                 _zdcurtain_ref.slice_black_detected_at_timestamp
@@ -472,33 +488,33 @@ def __check_load_confidence(
             return True
     elif (
         similarity <= threshold
-        and _zdcurtain_ref.active_load_type == "none"
+        and _zdcurtain_ref.active_load_type == LoadType.NONE
         and _zdcurtain_ref.potential_load_type == load_type
     ):
-        _zdcurtain_ref.potential_load_type = "none"
+        _zdcurtain_ref.potential_load_type = LoadType.NONE
 
     return False
 
 
-def __check_load_cooldown(_zdcurtain_ref: "ZDCurtain"):
+def __check_load_cooldown(_zdcurtain_ref: "ZDCurtain", now: int):
     if (
-        _zdcurtain_ref.load_cooldown_type != "none"
-        and perf_counter_ns()
+        _zdcurtain_ref.load_cooldown_type != LoadType.NONE
+        and now
         > _zdcurtain_ref.load_cooldown_timestamp
-        + ms_to_ns(_zdcurtain_ref.settings_dict[f"load_cooldown_{_zdcurtain_ref.load_cooldown_type}_ms"])
+        + ms_to_ns(_zdcurtain_ref.settings_dict[LOAD_COOLDOWN_SETTINGS[_zdcurtain_ref.load_cooldown_type]])
     ):
         _zdcurtain_ref.load_cooldown_timestamp = 0
-        _zdcurtain_ref.load_cooldown_type = "none"
+        _zdcurtain_ref.load_cooldown_type = LoadType.NONE
         _zdcurtain_ref.load_cooldown_is_active = False
 
 
-def __check_if_load_ending(_zdcurtain_ref: "ZDCurtain"):
+def __check_if_load_ending(_zdcurtain_ref: "ZDCurtain", now: int):
     if _zdcurtain_ref.load_removal_session is None:
         return
 
     black_screen_over_detection_timestamp = (
         _zdcurtain_ref.slice_black_over_detected_at_timestamp
-        if _zdcurtain_ref.active_load_type == "spinner"
+        if _zdcurtain_ref.active_load_type == LoadType.SPINNER
         else _zdcurtain_ref.full_black_over_detected_at_timestamp
     )
 
@@ -508,16 +524,16 @@ def __check_if_load_ending(_zdcurtain_ref: "ZDCurtain"):
         # we don't check for load blocking here because we want a load removal
         # to conclude gracefully even if future loads need to be blocked
     ):
-        if _zdcurtain_ref.active_load_type not in {"none", "black"}:  # noqa: SIM102 need _zdcurtain_ref.active_load_type
+        if not _zdcurtain_ref.active_load_type & LOAD_DETECTION_ACTIVE_LOAD_TYPES:  # noqa: SIM102 need _zdcurtain_ref.active_load_type
             if (
-                _zdcurtain_ref.load_cooldown_type == "none"
-                and _zdcurtain_ref.settings_dict[f"load_cooldown_{_zdcurtain_ref.active_load_type}_ms"] > 0
+                _zdcurtain_ref.load_cooldown_type == LoadType.NONE
+                and _zdcurtain_ref.settings_dict[LOAD_COOLDOWN_SETTINGS[_zdcurtain_ref.active_load_type]] > 0
             ):
                 _zdcurtain_ref.load_cooldown_type = _zdcurtain_ref.active_load_type
-                _zdcurtain_ref.load_cooldown_timestamp = perf_counter_ns()
+                _zdcurtain_ref.load_cooldown_timestamp = now
                 _zdcurtain_ref.load_cooldown_is_active = True
 
-        if perf_counter_ns() - black_screen_over_detection_timestamp > _zdcurtain_ref.load_confidence_delta:
+        if now - black_screen_over_detection_timestamp > _zdcurtain_ref.load_confidence_delta:
             _zdcurtain_ref.single_load_time_removed_ms = ns_to_ms(
                 _zdcurtain_ref.load_confidence_delta
                 + (
@@ -527,14 +543,14 @@ def __check_if_load_ending(_zdcurtain_ref: "ZDCurtain"):
             )
 
             debug_log(
-                f'Detected "{_zdcurtain_ref.active_load_type}" load at '
+                f'Detected "{_zdcurtain_ref.active_load_type.label}" load at '
                 + f"{_zdcurtain_ref.confirmed_load_detected_at_timestamp}"
             )
 
             _zdcurtain_ref.load_time_removed_ms += _zdcurtain_ref.single_load_time_removed_ms
 
             _ = _zdcurtain_ref.load_removal_session.create_load_removal_record(
-                _zdcurtain_ref.active_load_type, _zdcurtain_ref.single_load_time_removed_ms
+                _zdcurtain_ref.active_load_type.label, _zdcurtain_ref.single_load_time_removed_ms
             )
 
             _zdcurtain_ref.after_load_list_changed_signal.emit()
@@ -1,18 +1,45 @@
 import csv
-import datetime
 import json
+from bisect import bisect_left
+from collections import Counter
 
 from openpyxl import Workbook
 from pathvalidate import sanitize_filename
 from PySide6.QtWidgets import QFileDialog
 
-from utils import LocalTime, flatten_dict, get_version
+from utils import LocalTime, get_version
+
+EXPORT_FIELD_NAMES = (
+    "loadTimeRemoved",
+    "loadType",
+    "wasLoadLost",
+    "wasLoadDiscarded",
+    "discardType",
+    "eventDateTime_date",
+    "eventDateTime_timestamp",
+    "eventDateTime_timezone",
+)
+"""Columns of the CSV and Excel exports, in the order of each load's `to_row`"""
+EXCEL_HEADERS = (
+    "Load Time Removed",
+    "Load Type",
+    "Was Load Lost?",
+    "Was Load Discarded?",
+    "Discard Type",
+    "Event Date",
+    "Event Timestamp",
+    "Event Timezone",
+)
+"""Human-readable names of `EXPORT_FIELD_NAMES` for the Excel export"""
+EXCEL_COLUMN_WIDTHS = (("A", 19), ("B", 10), ("C", 14), ("D", 19), ("E", 12), ("F", 31), ("G", 16), ("H", 22))
 
 
 class LoadRemovalSession:
     def __init__(self):
         now = LocalTime()
         self.__loads = []
+        self.__load_type_counts = Counter()
+        """Amount of loads of each type, kept up to date so counting doesn't go over every load"""
         self.sessionInfo = LoadRemovalSessionInfo(now, get_version(), self)
 
     def export_loads(self, data_format, filename):
@@ -31,16 +58,18 @@ class LoadRemovalSession:
 
     def create_load_removal_record(self, load_type, load_time_removed):
         now = LocalTime()
-        self.__loads.append(LoadRemovalRecordEntry(load_type, load_time_removed, now))
-        return self.__loads[-1]
+        return self.__add_load(LoadRemovalRecordEntry(load_type, load_time_removed, now))
 
     def create_lost_load_record(self, load_type, load_lost_at):
-        self.__loads.append(LostLoadEntry(load_type, load_lost_at))
-        return self.__loads[-1]
+        return self.__add_load(LostLoadEntry(load_type, load_lost_at))
 
     def create_discarded_load_record(self, load_type, load_discarded_at, discard_type):
-        self.__loads.append(DiscardedLoadEntry(load_type, load_discarded_at, discard_type))
-        return self.__loads[-1]
+        return self.__add_load(DiscardedLoadEntry(load_type, load_discarded_at, discard_type))
+
+    def __add_load(self, load):
+        self.__loads.append(load)
+        self.__load_type_counts[load.loadType] += 1
+        return load
 
     def get_session_started_at(self):
         return self.sessionInfo.startedAt
@@ -52,19 +81,13 @@ class LoadRemovalSession:
         return len(self.__loads)
 
     def get_major_load_count(self):
-        major_loads = [load for load in self.__loads if load.loadType != "black"]
-
-        return len(major_loads)
+        return len(self.__loads) - self.__load_type_counts["black"]
 
     def get_transition_load_count(self):
-        transition_loads = [load for load in self.__loads if load.loadType not in {"black", "spinner"}]
-
-        return len(transition_loads)
+        return len(self.__loads) - self.__load_type_counts["black"] - self.__load_type_counts["spinner"]
 
     def get_load_type_count(self, load_type):
-        loads = [load for load in self.__loads if load.loadType != load_type]
-
-        return len(loads)
+        return len(self.__loads) - self.__load_type_counts[load_type]
 
     def get_latest_load(self):
         if self.get_load_count() > 0:
@@ -72,18 +95,15 @@ class LoadRemovalSession:
         return None
 
     def get_recent_loads(self, seconds_to_look_back, *, removals_only=False):
-        loads = None
+        loads = self.__loads
 
         if removals_only:
-            loads = [x for x in self.__loads if isinstance(x, LoadRemovalRecordEntry)]
-        else:
-            loads = self.__loads
+            loads = [x for x in loads if isinstance(x, LoadRemovalRecordEntry)]
 
-        now = LocalTime().get_datetime()
-        time_delta = datetime.timedelta(seconds=seconds_to_look_back * -1)
-        adjusted_datetime = now + time_delta
+        # Loads are recorded in chronological order, so the oldest recent one can be binary searched
+        cutoff_timestamp = LocalTime().timestamp - seconds_to_look_back
 
-        return [x for x in loads if x.loadRemovedAt.get_datetime() >= adjusted_datetime]
+        return loads[bisect_left(loads, cutoff_timestamp, key=lambda x: x.loadRemovedAt.timestamp) :]
 
     def delete_load(self, datetime):
         if self.get_load_count() > 0:
@@ -93,78 +113,25 @@ class LoadRemovalSession:
             )
 
             if load_to_delete_index is not None:
-                del self.__loads[load_to_delete_index]
+                self.__load_type_counts[self.__loads.pop(load_to_delete_index).loadType] -= 1
 
     def __write_to_csv(self, filepath):
-        field_names = [
-            "loadTimeRemoved",
-            "loadType",
-            "wasLoadLost",
-            "wasLoadDiscarded",
-            "discardType",
-            "eventDateTime_date",
-            "eventDateTime_timestamp",
-            "eventDateTime_timezone",
-        ]
-
-        session_dict = self.to_dict()
-        loads = session_dict.get("loads")
-
-        loads_as_dict = []
-
-        if loads is not None:
-            for load in loads:
-                flattened_dict = flatten_dict(load)
-                loads_as_dict.append(flattened_dict)
-
         with open(filepath, "w", newline="", encoding="utf8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=field_names)
-            writer.writeheader()
-            writer.writerows(loads_as_dict)
+            writer = csv.writer(csvfile)
+            writer.writerow(EXPORT_FIELD_NAMES)
+            writer.writerows(load.to_row() for load in self.__loads)
 
     def __write_to_excel(self, filepath, sheet_name):
         workbook = Workbook(write_only=True)
         sheet = workbook.create_sheet(sheet_name)
 
-        sheet.column_dimensions["A"].width = 19
-        sheet.column_dimensions["B"].width = 10
-        sheet.column_dimensions["C"].width = 14
-        sheet.column_dimensions["D"].width = 19
-        sheet.column_dimensions["E"].width = 12
-        sheet.column_dimensions["F"].width = 31
-        sheet.column_dimensions["G"].width = 16
-        sheet.column_dimensions["H"].width = 22
-
-        field_names = [
-            "loadTimeRemoved",
-            "loadType",
-            "wasLoadLost",
-            "wasLoadDiscarded",
-            "discardType",
-            "eventDateTime_date",
-            "eventDateTime_timestamp",
-            "eventDateTime_timezone",
-        ]
-
-        sheet.append([
-            "Load Time Removed",
-            "Load Type",
-            "Was Load Lost?",
-            "Was Load Discarded?",
-            "Discard Type",
-            "Event Date",
-            "Event Timestamp",
-            "Event Timezone",
-        ])
-
-        session_dict = self.to_dict()
-        loads = session_dict.get("loads")
-
-        if loads is not None:
-            for load in loads:
-                flattened_dict = flatten_dict(load)
-                values = (flattened_dict[k] for k in field_names)
-                sheet.append(values)
+        for column, width in EXCEL_COLUMN_WIDTHS:
+            sheet.column_dimensions[column].width = width
+
+        sheet.append(EXCEL_HEADERS)
+
+        for load in self.__loads:
+            sheet.append(load.to_row())
 
         workbook.save(filepath)
 
@@ -194,6 +161,10 @@ class LostLoadEntry:
             "discardType": "",
         }
 
+    def to_row(self):
+        event = self.loadLostAt
+        return (0, self.loadType, "yes", "no", "", event.date, event.timestamp, event.timeZone)
+
     def to_string(self):
         return (
             f'[{self.loadLostAt.date}]: WARNING: LOST load of type "{self.loadType}", check your '
@@ -217,6 +188,10 @@ class DiscardedLoadEntry:
             "discardType": self.discardType,
         }
 
+    def to_row(self):
+        event = self.loadDiscardedAt
+        return (0, self.loadType, "no", "yes", self.discardType, event.date, event.timestamp, event.timeZone)
+
     def to_string(self):
         return (
             f"[{self.loadDiscardedAt.date}]: ZDCurtain discarded erroneous load of type "
@@ -240,6 +215,19 @@ class LoadRemovalRecordEntry:
             "discardType": "",
         }
 
+    def to_row(self):
+        event = self.loadRemovedAt
+        return (
+            self.loadTimeRemoved,
+            self.loadType,
+            "no",
+            "no",
+            "",
+            event.date,
+            event.timestamp,
+            event.timeZone,
+        )
+
     def to_string(self):
         return (
             f'[{self.loadRemovedAt.date}]: removed load type "{self.loadType}"'
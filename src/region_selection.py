@@ -32,9 +32,10 @@ def select_window(zdcurtain: "ZDCurtain"):
     selector = SelectWindowWidget()
 
     # Need to wait until the user has selected a region using the widget before moving on with
-    # selecting the window settings
-    while not selector.isHidden():
-        QTest.qWait(1)
+    # selecting the window settings. Events keep being processed until the selector is closed.
+    event_loop = QtCore.QEventLoop()
+    selector.closed.connect(event_loop.quit)
+    event_loop.exec()
     selection = selector.selection
     del selector
     if selection is None:
@@ -79,14 +80,16 @@ def select_window(zdcurtain: "ZDCurtain"):
 
 
 def __set_region_values(zdcurtain: "ZDCurtain", x: int, y: int, width: int, height: int):
-    zdcurtain.settings_dict["capture_region"]["x"] = x
-    zdcurtain.settings_dict["capture_region"]["y"] = y
-    zdcurtain.settings_dict["capture_region"]["width"] = width
-    zdcurtain.settings_dict["capture_region"]["height"] = height
+    capture_region = zdcurtain.settings_dict["capture_region"]
+    capture_region["x"] = x
+    capture_region["y"] = y
+    capture_region["width"] = width
+    capture_region["height"] = height
 
 
 class BaseSelectWidget(QtWidgets.QWidget):
     selection: Region | None = None
+    closed = QtCore.Signal()
 
     def __init__(self):
         super().__init__()
@@ -111,6 +114,11 @@ class BaseSelectWidget(QtWidgets.QWidget):
         if event.key() == QtCore.Qt.Key.Key_Escape:
             self.close()
 
+    @override
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        super().closeEvent(event)
+        self.closed.emit()
+
 
 class SelectWindowWidget(BaseSelectWidget):
     """Widget to select a window and obtain its bounds."""
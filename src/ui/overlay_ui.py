@@ -4,7 +4,14 @@ from gen import overlay as overlay_ui
 from PySide6 import QtCore, QtWidgets
 from vcolorpicker import ColorPicker
 
-from utils import INVALID_COLOR, ONE_SECOND, create_icon, to_whole_css_rgb, use_black_or_white_text
+from utils import (
+    INVALID_COLOR,
+    ONE_SECOND,
+    LoadType,
+    create_icon,
+    to_whole_css_rgb,
+    use_black_or_white_text,
+)
 
 if TYPE_CHECKING:
     from ui.zdcurtain_ui import ZDCurtain
@@ -116,17 +123,17 @@ class __OverlayWidget(QtWidgets.QWidget, overlay_ui.Ui_OverlayWidget):
 
     def __change_icon(self):
         match self._zdcurtain_ref.active_load_type:
-            case "black":
+            case LoadType.BLACK:
                 create_icon(self.black_screen_load_icon, self._zdcurtain_ref.loading_icon)
-            case "elevator":
+            case LoadType.ELEVATOR:
                 create_icon(self.elevator_tracking_icon, self._zdcurtain_ref.loading_icon)
-            case "tram":
+            case LoadType.TRAM:
                 create_icon(self.tram_tracking_icon, self._zdcurtain_ref.loading_icon)
-            case "teleportal":
+            case LoadType.TELEPORTAL:
                 create_icon(self.teleportal_tracking_icon, self._zdcurtain_ref.loading_icon)
-            case "egg":
+            case LoadType.EGG:
                 create_icon(self.egg_tracking_icon, self._zdcurtain_ref.loading_icon)
-            case "spinner":
+            case LoadType.SPINNER:
                 create_icon(self.black_screen_load_icon, self._zdcurtain_ref.loading_icon)
             case _:
                 self.__bind_icons()
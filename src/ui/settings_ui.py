@@ -12,7 +12,7 @@ from capture_method import (
     change_capture_method,
     get_all_video_capture_devices,
 )
-from hotkeys import HOTKEYS, set_hotkey
+from hotkeys import set_hotkey
 from user_profile import DEFAULT_PROFILE, UserProfileDict
 from utils import ONE_SECOND, fire_and_forget
 
@@ -137,13 +137,10 @@ class __SettingsWidget(QtWidgets.QWidget, settings_ui.Ui_SettingsWidget):
 
     def __setup_bindings(self):
         # Hotkey initial values and bindings
-        for hotkey in HOTKEYS:
-            hotkey_input: QtWidgets.QLineEdit = getattr(self, f"{hotkey}_input")
-            set_hotkey_hotkey_button: QtWidgets.QPushButton = getattr(
-                self,
-                f"set_{hotkey}_hotkey_button",
-            )
-            hotkey_input.setText(self._zdcurtain_ref.settings_dict.get(f"{hotkey}_hotkey", ""))
+        for hotkey, binding in self._zdcurtain_ref.hotkey_bindings.items():
+            hotkey_input: QtWidgets.QLineEdit = getattr(self, binding.input_name)
+            set_hotkey_hotkey_button: QtWidgets.QPushButton = getattr(self, binding.button_name)
+            hotkey_input.setText(self._zdcurtain_ref.settings_dict.get(binding.settings_key, ""))
 
             set_hotkey_hotkey_button.clicked.connect(partial(set_hotkey, self._zdcurtain_ref, hotkey=hotkey))
 
@@ -2,30 +2,12 @@
 from __future__ import annotations
 
 import sys
-from datetime import timedelta
-from time import perf_counter_ns
-
-# Prevent PyAutoGUI and pywinctl from setting Process DPI Awareness,
-# which Qt tries to do then throws warnings about it.
-# The unittest workaround significantly increases
-# build time, boot time and build size with PyInstaller.
-# https://github.com/asweigart/pyautogui/issues/663#issuecomment-1296719464
-# QT doesn't call those from Python/ctypes, meaning we can stop other programs from setting it.
-if sys.platform == "win32":
-    import ctypes
-
-    def do_nothing(*_): ...
-
-    # pyautogui._pyautogui_win.py
-    ctypes.windll.user32.SetProcessDPIAware = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
-    # pymonctl._pymonctl_win.py
-    # pywinbox._pywinbox_win.py
-    ctypes.windll.shcore.SetProcessDpiAwareness = do_nothing  # pyright: ignore[reportAttributeAccessIssue]
-
-
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from datetime import timedelta
 from math import floor
+from time import perf_counter_ns
 from types import FunctionType
 from typing import NoReturn, override
 
@@ -38,10 +20,11 @@ from PySide6.QtWidgets import QApplication, QMainWindow
 
 import error_messages
 from capture_method import CaptureMethodBase, CaptureMethodEnum
-from frame_analysis import crop_image, normalize_brightness_histogram
-from hotkeys import HOTKEYS, after_setting_hotkey
+from frame_analysis import crop_image_unchecked, normalize_brightness_histogram
+from hotkeys import after_setting_hotkey, create_hotkey_bindings
 from image_utilities import load_comparison_images, load_images, set_preview_image, take_screenshot
 from load_removal import (
+    SIMILARITY_ANALYSIS_WORKERS,
     mark_load_as_lost,
     perform_black_level_analysis,
     perform_load_removal_logic,
@@ -69,6 +52,7 @@ from utils import (
     BLACKOUT_SIDE_LENGTH,
     ONE_SECOND,
     ZDCURTAIN_VERSION,
+    LoadType,
     LocalTime,
     create_icon,
     create_yes_no_dialog,
@@ -136,9 +120,12 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
 
         sys.excepthook = error_messages.make_excepthook(self)
 
-        # Hotkeys need to be initialized to be passed as thread arguments in hotkeys.py
-        for hotkey in HOTKEYS:
-            setattr(self, f"{hotkey}_hotkey", None)
+        self.similarity_analysis_executor = ThreadPoolExecutor(
+            max_workers=SIMILARITY_ANALYSIS_WORKERS, thread_name_prefix="similarity_analysis"
+        )
+
+        # Table of every hotkey's settings key, settings widget names, signal and keyboard hook
+        self.hotkey_bindings = create_hotkey_bindings(self)
 
         self.settings_dict = get_default_settings_from_ui()
 
@@ -259,9 +246,9 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
         self.is_tracking = False
 
         # load classification and measurement
-        self.active_load_type = "none"
-        self.potential_load_type = "none"
-        self.load_cooldown_type = "none"
+        self.active_load_type = LoadType.NONE
+        self.potential_load_type = LoadType.NONE
+        self.load_cooldown_type = LoadType.NONE
         self.single_load_time_removed_ms = 0.0
         self.load_time_removed_ms = 0.0
         self.load_cooldown_timestamp = 0
@@ -327,6 +314,8 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
         self.capture_view_resized = None
         self.capture_view_resized_normalized = None
         self.capture_view_resized_cropped = None
+        self.last_analyzed_capture = None
+        """Raw capture the black level and similarity values were last computed from"""
         self.ever_had_capture = False
         self.attempt_to_recover_capture_if_lost = False
 
@@ -517,7 +506,8 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
                     self.ever_had_capture = True
 
                 dim = (640, 360)
-                self.capture_view_resized = resize_image(self.capture_view_raw.copy(), dim, 1, cv2.INTER_AREA)
+                # resize always writes to a new image, so the raw capture is left untouched
+                self.capture_view_resized = resize_image(self.capture_view_raw, dim, 1, cv2.INTER_AREA)
                 # black out rounded corners
                 black = rgba_to_bgra((0, 0, 0, 255))
 
@@ -536,9 +526,8 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
                     -1,
                 )
 
-                self.capture_view_resized_normalized = normalize_brightness_histogram(
-                    self.capture_view_resized.copy()
-                )
+                # Computed on first use, only some comparisons and previews need it
+                self.capture_view_resized_normalized = None
 
                 capture_view_to_use = self.get_capture_view_by_name(
                     self.settings_dict["capture_view_preview"]
@@ -550,17 +539,25 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
                 if self.is_tracking:
                     bsd_area = self.settings_dict["black_screen_detection_region"]
 
-                    self.capture_view_resized_cropped = crop_image(
-                        self.capture_view_resized.copy(),
+                    # Only copy the cropped region, not the whole frame
+                    self.capture_view_resized_cropped = crop_image_unchecked(
+                        self.capture_view_resized,
                         bsd_area["x"],
                         bsd_area["y"],
                         bsd_area["x"] + bsd_area["width"],
                         bsd_area["y"] + bsd_area["height"],
-                    )
+                    ).copy()
+
+                    # Capture methods return the same image again when no new frame arrived,
+                    # the values from the last analysis still apply to it
+                    if self.capture_view_raw is not self.last_analyzed_capture:
+                        perform_black_level_analysis(self)
+                        perform_similarity_analysis(self)
+                        self.last_analyzed_capture = self.capture_view_raw
 
-                    perform_black_level_analysis(self)
-                    perform_similarity_analysis(self)
                     perform_load_removal_logic(self)
+                else:
+                    self.last_analyzed_capture = None
             elif (
                 self.settings_dict["captured_window_title"]
                 and self.ever_had_capture
@@ -655,9 +652,9 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
 
     def __reset_tracking_variables(self):
         # load classification and measurement
-        self.active_load_type = "none"
-        self.potential_load_type = "none"
-        self.load_cooldown_type = "none"
+        self.active_load_type = LoadType.NONE
+        self.potential_load_type = LoadType.NONE
+        self.load_cooldown_type = LoadType.NONE
         self.single_load_time_removed_ms = 0.0
         self.load_time_removed_ms = 0.0
         self.load_cooldown_timestamp = 0
@@ -824,17 +821,22 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
             case "standard_resized":
                 return self.capture_view_resized
             case "normalized_resized":
-                return self.capture_view_resized_normalized
+                return self.__get_capture_view_resized_normalized()
             case _:
                 raise KeyError(f"{capture_type!r} is not a valid capture type for screenshots")
 
+    def __get_capture_view_resized_normalized(self):
+        if self.capture_view_resized_normalized is None and is_valid_image(self.capture_view_resized):
+            self.capture_view_resized_normalized = normalize_brightness_histogram(self.capture_view_resized)
+        return self.capture_view_resized_normalized
+
     def get_capture_view_by_name(self, capture_view_name: str) -> MatLike:
         capture_view_to_use = None
         match capture_view_name:
             case "standard_resized":
                 capture_view_to_use = self.capture_view_resized
             case "normalized_resized":
-                capture_view_to_use = self.capture_view_resized_normalized
+                capture_view_to_use = self.__get_capture_view_resized_normalized()
             case "cropped_resized":
                 capture_view_to_use = self.capture_view_resized_cropped
             case "raw":
@@ -1099,6 +1101,7 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
             filename = get_sanitized_filename(f"zdcurtain_{now.date}")
 
             take_screenshot(
+                self,
                 self.settings_dict["screenshot_directory"],
                 filename,
                 capture_view,
@@ -1110,6 +1113,7 @@ class ZDCurtain(QMainWindow, zdcurtain_ui.Ui_ZDCurtain):
 
         def exit_program(_zdcurtain_ref, event) -> NoReturn:
             _zdcurtain_ref.capture_method.close()
+            _zdcurtain_ref.similarity_analysis_executor.shutdown(wait=False, cancel_futures=True)
             if event is not None:
                 event.accept()
             sys.exit()
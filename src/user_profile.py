@@ -9,7 +9,7 @@ from PySide6 import QtWidgets
 
 import error_messages
 from capture_method import CAPTURE_METHODS, CaptureMethodEnum, Region, change_capture_method
-from hotkeys import HOTKEYS, Hotkey, remove_all_hotkeys, set_hotkey
+from hotkeys import remove_all_hotkeys, set_hotkey
 from ui import settings_ui
 from utils import INVALID_COLOR, working_directory
 
@@ -198,11 +198,10 @@ def __load_settings_from_file(zdcurtain: "ZDCurtain", load_settings_file_path: s
         return False
 
     remove_all_hotkeys()
-    for hotkey, hotkey_name in ((hotkey, f"{hotkey}_hotkey") for hotkey in HOTKEYS):
-        hotkey_value = zdcurtain.settings_dict.get(hotkey_name)
+    for hotkey, binding in zdcurtain.hotkey_bindings.items():
+        hotkey_value = zdcurtain.settings_dict.get(binding.settings_key)
         if hotkey_value:
-            # cast caused by a regression in pyright 1.1.365
-            set_hotkey(zdcurtain, cast(Hotkey, hotkey), hotkey_value)
+            set_hotkey(zdcurtain, hotkey, hotkey_value)
 
     change_capture_method(
         cast(CaptureMethodEnum, zdcurtain.settings_dict["capture_method"]),
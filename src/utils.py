@@ -58,6 +58,23 @@ class ColorChannel(IntEnum):
     Alpha = 3
 
 
+class LoadType(IntEnum):
+    """Values are bit flags, so that a group of load types can be checked with a single `&`."""
+
+    NONE = 1
+    BLACK = 2
+    ELEVATOR = 4
+    TRAM = 8
+    TELEPORTAL = 16
+    EGG = 32
+    SPINNER = 64
+
+    @property
+    def label(self):
+        """Name used in settings keys, logs and load records."""
+        return self.name.lower()
+
+
 class LocalTime:
     def __init__(self, timestamp=None):
         timezone_local = tzlocal()
@@ -70,9 +87,11 @@ class LocalTime:
         self.timestamp = datetime_local.timestamp()
         self.date = datetime_local.isoformat()
         self.timeZone = timezone_local.tzname(datetime_local)
+        self.__datetime = datetime_local
 
     def get_datetime(self):
-        return datetime.fromisoformat(self.date)
+        # Kept from construction, rather than parsing `date` back on every call
+        return self.__datetime
 
     def to_dict(self):
         return {"date": self.date, "timestamp": self.timestamp, "timezone": self.timeZone}
@@ -286,7 +305,8 @@ def create_icon(qlabel: QLabel, image: MatLike | None):
         height, width, channels = image.shape
 
         if channels == BGRA_CHANNEL_COUNT:
-            image_format = QtGui.QImage.Format.Format_RGBA8888
+            # BGRA bytes are ARGB32 on little-endian, which lets Qt read the icon without conversion
+            image_format = QtGui.QImage.Format.Format_ARGB32
         else:
             image_format = QtGui.QImage.Format.Format_BGR888
 
@@ -356,7 +376,8 @@ def check_if_image_has_transparency(image: MatLike):
     # and if at least one pixel is transparent (< 255)
     if image.shape[ImageShape.Channels] != BGRA_CHANNEL_COUNT:
         return False
-    mean: float = image[:, :, ColorChannel.Alpha].mean()
+    # cv2.mean reduces all channels in one vectorized pass, unlike a numpy mean over a strided view
+    mean: float = cv2.mean(image)[ColorChannel.Alpha]
     if mean == 0:
         # Non-transparent images code path is usually faster and simpler, so let's return that
         return False
@@ -367,18 +388,6 @@ def check_if_image_has_transparency(image: MatLike):
     return mean != MAXBYTE
 
 
-def flatten_dict(d, parent_key="", sep="_"):
-    """Convert nested dictionary to flat structure."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-
 DWMWA_EXTENDED_FRAME_BOUNDS = 9
 MAXBYTE = 255
 ONE_SECOND = 1000